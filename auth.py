@@ -1,10 +1,63 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from config import settings
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing. Pinning min and max rounds to the cost factor makes
+# hashes made at any other cost "need update", so they are rehashed on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL, so a few threads keep a login burst from
+# serializing on the event loop without competing with every calculation
+password_executor = ThreadPoolExecutor(max_workers=max(1, settings.PASSWORD_HASH_WORKERS), thread_name_prefix="password")
+
+class LatencyStats:
+    """Count, mean and percentiles of the most recent `window` durations per operation"""
+    
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+    
+    def record(self, operation: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self.window)).append(seconds * 1000)
+            self._counts[operation] = self._counts.get(operation, 0) + 1
+    
+    def get_stats(self) -> dict:
+        with self._lock:
+            samples = {operation: sorted(durations) for operation, durations in self._samples.items()}
+            counts = dict(self._counts)
+        
+        def percentile(durations, fraction):
+            return round(durations[min(len(durations) - 1, int(fraction * len(durations)))], 2)
+        
+        return {
+            operation: {
+                'count': counts[operation],
+                'mean_ms': round(sum(durations) / len(durations), 2),
+                'p50_ms': percentile(durations, 0.5),
+                'p95_ms': percentile(durations, 0.95),
+                'p99_ms': percentile(durations, 0.99),
+                'max_ms': round(durations[-1], 2)
+            }
+            for operation, durations in samples.items()
+        }
+
+password_hash_latency = LatencyStats()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
@@ -14,6 +67,25 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def run_password_operation(operation: str, fn, *args):
+    """Run a bcrypt call in the password pool, recording how long it took including time queued"""
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, fn, *args)
+    finally:
+        password_hash_latency.record(operation, time.perf_counter() - started)
+
+async def hash_password(password: str) -> str:
+    """Hash a password off the event loop"""
+    return await run_password_operation("hash", get_password_hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password off the event loop. Also returns a new hash when the stored
+    one was made with a different cost factor, or None when it is current.
+    """
+    return await run_password_operation("verify", pwd_context.verify_and_update, plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: timedelta = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -0,0 +1,66 @@
+"""
+Benchmark the Monte Carlo samplers: FIRE number error versus run count.
+
+For a fixed scenario, a reference FIRE number is computed with a large pseudo-random
+run. Each sampler then solves the same scenario with several run counts over many seeds,
+and the root-mean-square error against the reference is reported.
+
+Usage: python benchmark_samplers.py [--seeds 30] [--reference-runs 400000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from fire_calculator import FireCalculator, SAMPLERS
+
+SCENARIO = dict(
+    current_age=35,
+    retirement_age=55,
+    current_assets=200000,
+    monthly_income=8000,
+    monthly_expenses=4000,
+    monthly_savings=2000,
+    retirement_expenses=50000,
+    social_security_enabled=True,
+    social_security_start_age=67,
+    social_security_monthly_benefit=2000
+)
+
+RUN_COUNTS = (256, 512, 1024, 2048, 4096, 8192)
+
+
+def solve(runs: int, seed: int, sampler: str) -> float:
+    calculator = FireCalculator(**SCENARIO, monte_carlo_runs=runs, seed=seed, sampler=sampler)
+    return calculator.calculate_fire_number()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seeds', type=int, default=30, help='seeds per sampler and run count')
+    parser.add_argument('--reference-runs', type=int, default=400000, help='paths in the reference solution')
+    args = parser.parse_args()
+
+    reference = solve(args.reference_runs, seed=0, sampler='pseudo')
+    print(f"Reference FIRE number ({args.reference_runs:,} pseudo-random paths): ${reference:,.0f}")
+    print()
+    print(f"{'runs':>6}  " + "  ".join(f"{sampler + ' RMSE %':>16}" for sampler in SAMPLERS))
+
+    timings = {sampler: 0.0 for sampler in SAMPLERS}
+    for runs in RUN_COUNTS:
+        row = []
+        for sampler in SAMPLERS:
+            started = time.perf_counter()
+            estimates = np.array([solve(runs, seed, sampler) for seed in range(1, args.seeds + 1)])
+            timings[sampler] += time.perf_counter() - started
+            rmse = np.sqrt(np.mean((estimates - reference) ** 2)) / reference * 100
+            row.append(f"{rmse:>16.2f}")
+        print(f"{runs:>6}  " + "  ".join(row))
+
+    print()
+    for sampler, seconds in timings.items():
+        print(f"{sampler:>10}: {seconds:.2f}s total")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Translation between API requests and responses and the calculation engine,
+shared by the app and the job workers
+"""
+import random
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+
+from config import settings
+from fire_calculator import MAX_SEED, SENSITIVITY_PARAMETERS
+from models import FireCalculation
+from projection_codec import encode_projection, decode_projection
+from schemas import (
+    FireCalculationCreate, FireCalculationResponse,
+    FireCalculationBatchCreate, FireCalculationBatchResult, FireCalculationBatchResponse,
+    SensitivityGridRequest, SensitivityGridResponse
+)
+
+
+# Inputs the API takes as percentages and FireCalculator takes as fractions
+PERCENT_INPUTS = ('investment_return_rate', 'inflation_rate', 'safe_withdrawal_rate')
+
+
+def calculator_kwargs(calculation: FireCalculationCreate) -> dict:
+    """Map API inputs (percentages) onto FireCalculator keyword arguments (fractions)"""
+    return dict(
+        current_age=calculation.current_age,
+        retirement_age=calculation.retirement_age,
+        current_assets=calculation.current_assets,
+        monthly_income=calculation.monthly_income,
+        monthly_expenses=calculation.monthly_expenses,
+        monthly_savings=calculation.monthly_savings,
+        retirement_expenses=calculation.retirement_expenses,
+        investment_return_rate=calculation.investment_return_rate / 100,
+        inflation_rate=calculation.inflation_rate / 100,
+        safe_withdrawal_rate=calculation.safe_withdrawal_rate / 100,
+        # Advanced mode parameters
+        advanced_mode=calculation.advanced_mode,
+        retirement_accounts=calculation.retirement_accounts or 0,
+        taxable_accounts=calculation.taxable_accounts or 0,
+        retirement_account_return_rate=(calculation.retirement_account_return_rate or 7.0) / 100,
+        # Social Security parameters
+        social_security_enabled=calculation.social_security_enabled,
+        social_security_start_age=calculation.social_security_start_age or 65,
+        social_security_monthly_benefit=calculation.social_security_monthly_benefit or 0,
+        # Spouse parameters
+        spouse_enabled=calculation.spouse_enabled,
+        spouse_age=calculation.spouse_age or 30,
+        spouse_social_security_enabled=calculation.spouse_social_security_enabled,
+        spouse_social_security_start_age=calculation.spouse_social_security_start_age or 65,
+        spouse_social_security_monthly_benefit=calculation.spouse_social_security_monthly_benefit or 0,
+        # 401K contribution parameters
+        contribution_401k_percentage=calculation.contribution_401k_percentage,
+        employer_match_percentage=calculation.employer_match_percentage,
+        # Monte Carlo parameters
+        seed=calculation.seed
+    )
+
+
+PROJECTION_FORMATS = ("json", "compact")
+
+
+def check_projection_format(projection_format: str):
+    if projection_format not in PROJECTION_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"projection_format must be one of {', '.join(PROJECTION_FORMATS)}"
+        )
+
+
+def projection_payload(projection_data, projection_format: str):
+    """
+    Projection data as plain JSON lists or in the compact encoding of projection_codec;
+    stored rows and fresh results may be in either form
+    """
+    check_projection_format(projection_format)
+    if projection_format == "compact":
+        return encode_projection(projection_data)
+    return decode_projection(projection_data)
+
+
+def new_calculation(user_id: int, calculation: FireCalculationCreate, results: dict) -> FireCalculation:
+    """A calculation record, with the seed actually used so it can be replayed"""
+    return FireCalculation(
+        user_id=user_id,
+        **calculation.dict(exclude={'seed'}),
+        fire_number=results['fire_number'],
+        coast_fire_number=results['coast_fire_number'],
+        years_to_fire=results['years_to_fire'],
+        years_to_coast_fire=results['years_to_coast_fire'],
+        coast_fire_age=results['coast_fire_age'],
+        projection_data=encode_projection(results['projection_data']),
+        seed=results['seed']
+    )
+
+
+def calculation_response(
+    calculation: FireCalculationCreate,
+    db_calculation: FireCalculation,
+    results: dict,
+    projection_format: str = "json"
+) -> FireCalculationResponse:
+    return FireCalculationResponse(
+        id=db_calculation.id,
+        **calculation.dict(exclude={'seed'}),
+        fire_number=results['fire_number'],
+        coast_fire_number=results['coast_fire_number'],
+        years_to_fire=results['years_to_fire'],
+        years_to_coast_fire=results['years_to_coast_fire'],
+        coast_fire_age=results['coast_fire_age'],
+        projection_data=projection_payload(results['projection_data'], projection_format),
+        percentile_trajectories=results['percentile_trajectories'],
+        seed=results['seed'],
+        monte_carlo_stats=results['monte_carlo_stats'],
+        created_at=db_calculation.created_at
+    )
+
+
+def expand_batch(batch: FireCalculationBatchCreate) -> list:
+    """List the batch's scenarios: explicit ones first, then base plus each override"""
+    scenarios = list(batch.scenarios)
+    if batch.overrides and batch.base is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Overrides require a base scenario"
+        )
+    if batch.base is not None:
+        base = batch.base.dict()
+        for index, override in enumerate(batch.overrides or [{}]):
+            # Unknown keys would otherwise be ignored, leaving a scenario identical to the base
+            unknown = sorted(set(override) - set(FireCalculationCreate.model_fields))
+            if unknown:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={"override": index, "errors": [f"Unknown field: {name}" for name in unknown]}
+                )
+            try:
+                scenarios.append(FireCalculationCreate(**{**base, **override}))
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={"override": index, "errors": e.errors(include_url=False)}
+                )
+    
+    if not scenarios:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Batch contains no scenarios"
+        )
+    if len(scenarios) > settings.BATCH_MAX_SCENARIOS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch can contain at most {settings.BATCH_MAX_SCENARIOS} scenarios"
+        )
+    return scenarios
+
+
+def batch_scenarios(batch: FireCalculationBatchCreate) -> tuple:
+    """The batch's seed and scenarios; scenarios without their own seed share the batch's random draws"""
+    scenarios = expand_batch(batch)
+    batch_seed = batch.seed if batch.seed is not None else random.randint(0, MAX_SEED)
+    scenarios = [
+        scenario if scenario.seed is not None else scenario.copy(update={'seed': batch_seed})
+        for scenario in scenarios
+    ]
+    return batch_seed, scenarios
+
+
+def batch_response(
+    batch_seed: int,
+    scenarios: list,
+    results: list,
+    db_calculations: list,
+    include_projection: bool
+) -> FireCalculationBatchResponse:
+    batch_results = []
+    for index, (scenario, scenario_results, db_calculation) in enumerate(zip(scenarios, results, db_calculations)):
+        batch_results.append(FireCalculationBatchResult(
+            index=index,
+            id=db_calculation.id if db_calculation else None,
+            inputs=scenario,
+            fire_number=scenario_results['fire_number'],
+            coast_fire_number=scenario_results['coast_fire_number'],
+            years_to_fire=scenario_results['years_to_fire'],
+            years_to_coast_fire=scenario_results['years_to_coast_fire'],
+            coast_fire_age=scenario_results['coast_fire_age'],
+            current_fire_status=scenario_results['current_fire_status'],
+            current_coast_fire_status=scenario_results['current_coast_fire_status'],
+            monthly_shortfall=scenario_results['monthly_shortfall'],
+            projection_data=scenario_results['projection_data'] if include_projection else None,
+            monte_carlo_stats=scenario_results['monte_carlo_stats']
+        ))
+    
+    return FireCalculationBatchResponse(seed=batch_seed, results=batch_results)
+
+
+def to_calculator_units(parameter: str, values: list) -> list:
+    if parameter in PERCENT_INPUTS:
+        return [value / 100 for value in values]
+    return values
+
+
+def sensitivity_grid_args(grid: SensitivityGridRequest) -> tuple:
+    """Validate a sensitivity grid request and return run_sensitivity_grid's arguments"""
+    for parameter, values in ((grid.x_parameter, grid.x_values), (grid.y_parameter, grid.y_values)):
+        if parameter is None:
+            continue
+        if parameter not in SENSITIVITY_PARAMETERS:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Cannot sweep {parameter}; choose from {', '.join(SENSITIVITY_PARAMETERS)}"
+            )
+        if parameter == 'current_assets' and grid.base.advanced_mode:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Advanced mode uses retirement_accounts and taxable_accounts; current_assets cannot be swept"
+            )
+        if not values or len(values) > settings.SENSITIVITY_GRID_MAX_VALUES:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Each swept input needs 1 to {settings.SENSITIVITY_GRID_MAX_VALUES} values"
+            )
+    if grid.x_parameter == grid.y_parameter:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Sweep two different inputs"
+        )
+    
+    return (
+        calculator_kwargs(grid.base),
+        grid.x_parameter,
+        to_calculator_units(grid.x_parameter, grid.x_values),
+        grid.y_parameter,
+        to_calculator_units(grid.y_parameter, grid.y_values) if grid.y_parameter else None,
+        settings.SENSITIVITY_GRID_RUNS
+    )
+
+
+def sensitivity_response(grid: SensitivityGridRequest, results: dict) -> SensitivityGridResponse:
+    # Report the axes in the units they were requested in
+    results['x_values'] = grid.x_values
+    results['y_values'] = grid.y_values if grid.y_parameter else None
+    return SensitivityGridResponse(**results)
@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from config import settings
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the calculation pool already has its maximum number of calculations in flight"""
+
+
+class CalculationPool:
+    """
+    Bounded executor for CPU-bound FIRE calculations.
+    Keeps simulations off the asyncio event loop and rejects new work once
+    queue_limit calculations are running or waiting.
+    """
+    
+    def __init__(self, executor_type: str, max_workers: int, queue_limit: int):
+        if executor_type not in ("process", "thread"):
+            raise ValueError(f"Unknown calculation executor: {executor_type}")
+        self.executor_type = executor_type
+        self.max_workers = max(1, max_workers)
+        self.queue_limit = max(1, queue_limit)
+        self.in_flight = 0
+        self.broken_pools = 0
+        self._executor: Optional[Executor] = None
+        self._manager = None
+        self._manager_lock = threading.Lock()
+    
+    def start(self):
+        """Start the manager process on startup, so no request waits for it to launch"""
+        if self.executor_type == "process":
+            self._get_manager()
+    
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use so importing the app does not fork workers"""
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="calculation")
+        return self._executor
+    
+    def _get_manager(self):
+        """The manager process that shares queues and events with process workers, started on first use"""
+        with self._manager_lock:
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            return self._manager
+    
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.queue_limit
+    
+    async def progress_queue(self) -> Any:
+        """
+        A queue workers can put progress events on and the event loop can poll.
+        Process workers need a manager-backed queue; creating one is a round trip
+        to the manager process, so it runs off the event loop.
+        """
+        if self.executor_type == "process":
+            return await asyncio.to_thread(lambda: self._get_manager().Queue())
+        return queue.Queue()
+    
+    async def cancel_token(self) -> Any:
+        """
+        An event a running calculation can poll with is_set() to learn it has been
+        cancelled. Process workers need a manager-backed event, created off the event loop.
+        """
+        if self.executor_type == "process":
+            return await asyncio.to_thread(lambda: self._get_manager().Event())
+        return threading.Event()
+    
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) in the pool, raising PoolSaturatedError if the queue is full"""
+        if self.saturated:
+            raise PoolSaturatedError(f"{self.in_flight} calculations already in flight")
+        
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            executor = self._get_executor()
+            try:
+                return await loop.run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed) and took the pool with it; start a fresh one for later calculations
+                self._replace_broken_executor(executor)
+                raise
+        finally:
+            self.in_flight -= 1
+    
+    def _replace_broken_executor(self, executor: Executor):
+        """Drop a broken executor; the next run creates a new one. Calls that raced on the same pool only drop it once."""
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            self.broken_pools += 1
+    
+    def shutdown(self):
+        """Stop the worker pool, cancelling calculations that have not started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._manager_lock:
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+
+calculation_pool = CalculationPool(
+    executor_type=settings.CALCULATION_EXECUTOR,
+    max_workers=settings.CALCULATION_WORKERS,
+    queue_limit=settings.CALCULATION_QUEUE_LIMIT
+)
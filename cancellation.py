@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, Awaitable, Dict, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+
+from config import settings
+
+
+# Header a page sends with a random id of its own, so its calculations can supersede each other
+CLIENT_SESSION_HEADER = "X-Client-Session"
+CLIENT_SESSION_MAX_LENGTH = 64
+
+
+def client_session(request: Request, scope: str, default: Optional[str] = None) -> Optional[str]:
+    """
+    The session a request belongs to: scope plus the id the client sent in
+    CLIENT_SESSION_HEADER, or default when it sent none (None: never superseded)
+    """
+    session_id = request.headers.get(CLIENT_SESSION_HEADER, "")
+    if not session_id or len(session_id) > CLIENT_SESSION_MAX_LENGTH:
+        return default
+    return f"{scope}:{session_id}"
+
+
+class CalculationSessions:
+    """
+    Tracks the calculation each session (one browser tab) is waiting on.
+    Starting a calculation with different inputs cancels the one it supersedes,
+    so stale work stops at its next simulation batch instead of running to
+    completion. Requests with the same inputs as the running calculation join
+    it instead, and share its result through the single-flight.
+    """
+    
+    def __init__(self):
+        self._sessions: Dict[str, Tuple[str, Set[asyncio.Future]]] = {}
+        self.stats = {
+            'started': 0,
+            'joined': 0,
+            'superseded': 0,
+            'disconnected': 0
+        }
+    
+    def start(self, session: Optional[str], key: str, task: asyncio.Future):
+        """Make task one of the session's current calculations, cancelling those for other inputs"""
+        self.stats['started'] += 1
+        if session is None:
+            return
+        current = self._sessions.get(session)
+        if current is not None and current[0] == key:
+            current[1].add(task)
+            self.stats['joined'] += 1
+            return
+        if current is not None:
+            for previous in current[1]:
+                if not previous.done():
+                    previous.cancel()
+                    self.stats['superseded'] += 1
+        self._sessions[session] = (key, {task})
+    
+    def finish(self, session: Optional[str], task: asyncio.Future):
+        current = self._sessions.get(session)
+        if current is not None and task in current[1]:
+            current[1].discard(task)
+            if not current[1]:
+                del self._sessions[session]
+    
+    async def run(self, session: Optional[str], key: str, request: Request, work: Awaitable[Any]) -> Any:
+        """
+        Await work for request as one of the session's current calculations. Answers
+        409 if a calculation with different inputs from the same session supersedes
+        it, and cancels it if the client disconnects while waiting.
+        """
+        task = asyncio.ensure_future(work)
+        self.start(session, key, task)
+        try:
+            while True:
+                await asyncio.wait({task}, timeout=settings.DISCONNECT_POLL_SECONDS)
+                if task.done():
+                    break
+                if await request.is_disconnected():
+                    task.cancel()
+                    self.stats['disconnected'] += 1
+                    # Nobody is listening for this response any more
+                    raise HTTPException(status_code=499, detail="Client closed request")
+            
+            if task.cancelled():
+                raise HTTPException(status_code=409, detail="Superseded by a newer calculation")
+            return task.result()
+        finally:
+            if not task.done():
+                task.cancel()
+            self.finish(session, task)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'active': len(self._sessions)}
+
+
+calculation_sessions = CalculationSessions()
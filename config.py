@@ -4,10 +4,60 @@ class Settings:
     def __init__(self):
         # Database
         self.DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fire_calculator.db")
+        # Connection pool (per worker process); pre-ping and recycle apply to PostgreSQL
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+        self.DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        self.DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+        self.DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+        self.DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+        # How long a SQLite write waits for a lock before failing
+        self.SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
         
         # JWT Settings
         self.SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
         self.ALGORITHM = "HS256"
         self.ACCESS_TOKEN_EXPIRE_MINUTES = 30
+        # Accounts allowed to read /api/stats (comma-separated emails); empty means nobody
+        self.ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+        
+        # Password hashing; changing the cost rehashes each password at its next login
+        self.BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        self.PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        # How long get_current_user trusts a cached token-to-user lookup (0 disables the cache)
+        self.USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+        self.USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+        
+        # Calculation executor ("process" or "thread")
+        self.CALCULATION_EXECUTOR = os.getenv("CALCULATION_EXECUTOR", "process")
+        self.CALCULATION_WORKERS = int(os.getenv("CALCULATION_WORKERS", str(os.cpu_count() or 1)))
+        # Calculations allowed in flight (running or waiting) before new ones are rejected with a 503
+        self.CALCULATION_QUEUE_LIMIT = int(os.getenv("CALCULATION_QUEUE_LIMIT", "32"))
+        self.CALCULATION_RETRY_AFTER_SECONDS = int(os.getenv("CALCULATION_RETRY_AFTER_SECONDS", "2"))
+        # How often /api/calculate/stream checks workers for progress events
+        self.PROGRESS_POLL_SECONDS = float(os.getenv("PROGRESS_POLL_SECONDS", "0.05"))
+        # How often a waiting request checks whether its client has disconnected
+        self.DISCONNECT_POLL_SECONDS = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.1"))
+        self.BATCH_MAX_SCENARIOS = int(os.getenv("BATCH_MAX_SCENARIOS", "100"))
+        self.SENSITIVITY_GRID_MAX_VALUES = int(os.getenv("SENSITIVITY_GRID_MAX_VALUES", "25"))
+        self.SENSITIVITY_GRID_RUNS = int(os.getenv("SENSITIVITY_GRID_RUNS", "2000"))
+        
+        # Background jobs: worker processes the app starts (0 to run `python job_worker.py` separately)
+        self.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+        self.JOB_POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1.0"))
+        # A worker renews its lease every heartbeat; a job whose lease lapses is retried up to JOB_MAX_ATTEMPTS times
+        self.JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        self.JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+        self.JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        # Queue delay charged per scenario or grid cell, so small jobs go first but large ones are never starved
+        self.JOB_PRIORITY_SECONDS_PER_UNIT = float(os.getenv("JOB_PRIORITY_SECONDS_PER_UNIT", "1.0"))
+        
+        # Unauthenticated /api/calculate/preview requests allowed per client IP
+        self.PREVIEW_RATE_LIMIT_PER_MINUTE = float(os.getenv("PREVIEW_RATE_LIMIT_PER_MINUTE", "30"))
+        self.PREVIEW_RATE_LIMIT_BURST = int(os.getenv("PREVIEW_RATE_LIMIT_BURST", "10"))
+        
+        # Calculation result cache (set RESULT_CACHE_SQLITE_PATH to persist entries across restarts)
+        self.RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024"))
+        self.RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+        self.RESULT_CACHE_SQLITE_PATH = os.getenv("RESULT_CACHE_SQLITE_PATH", "")
 
 settings = Settings()
\ No newline at end of file
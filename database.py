@@ -1,42 +1,117 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 import os
 
-# Database URL with fallback logic
-database_url = settings.DATABASE_URL
-
-# Handle PostgreSQL vs SQLite
-if database_url.startswith("postgresql://"):
-    try:
-        # Test PostgreSQL connection
-        test_engine = create_engine(database_url)
-        test_connection = test_engine.connect()
-        test_connection.close()
-        test_engine.dispose()
-    except Exception as e:
-        print(f"PostgreSQL connection failed: {e}")
-        print("Falling back to SQLite...")
-        database_url = "sqlite:///./fire_calculator.db"
-elif database_url.startswith("sqlite://"):
-    # Ensure the directory exists for SQLite
-    db_path = database_url.replace("sqlite:///", "")
-    os.makedirs(os.path.dirname(db_path) if os.path.dirname(db_path) else ".", exist_ok=True)
-
-# Create engine with appropriate settings
-if database_url.startswith("sqlite://"):
-    engine = create_engine(
-        database_url,
-        connect_args={"check_same_thread": False}
+SQLITE_FALLBACK_URL = "sqlite:///./fire_calculator.db"
+
+# Async drivers for the URL schemes DATABASE_URL may use
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://"
+}
+
+def async_database_url(database_url: str) -> str:
+    for scheme, async_scheme in ASYNC_DRIVERS.items():
+        if database_url.startswith(scheme):
+            return async_scheme + database_url[len(scheme):]
+    return database_url
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets history reads proceed while a calculation is being saved; busy_timeout waits out the remaining lock conflicts"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def create_engine_for(database_url: str):
+    """Create an async engine; connections are only opened on first use"""
+    if database_url.startswith("sqlite://"):
+        # Ensure the directory exists for SQLite
+        db_path = database_url.replace("sqlite:///", "")
+        os.makedirs(os.path.dirname(db_path) if os.path.dirname(db_path) else ".", exist_ok=True)
+        # aiosqlite defaults to opening a connection per checkout; pool them like PostgreSQL ones
+        sqlite_engine = create_async_engine(
+            async_database_url(database_url),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            connect_args={"check_same_thread": False}
+        )
+        event.listen(sqlite_engine.sync_engine, "connect", set_sqlite_pragmas)
+        return sqlite_engine
+    
+    return create_async_engine(
+        async_database_url(database_url),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS
     )
-else:
-    engine = create_engine(database_url)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Created by init_database on startup, so importing the app never touches the database
+engine = None
+
+# Objects stay usable after commit, since reloading them would need another round trip
+SessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+def upgrade_schema(connection, metadata):
+    """
+    Bring existing tables up to date with the models.
+    create_all() only creates missing tables, so columns added to a model
+    later are added here in place (they must be nullable or have a default),
+    and indexes declared later are created if they do not exist yet.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        for index in table.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+async def connect_database():
+    """Create the engine and bind sessions to it. If PostgreSQL cannot be reached, fall back to SQLite."""
+    global engine
+    
+    database_url = settings.DATABASE_URL
+    if database_url.startswith("postgresql://"):
+        try:
+            # Test PostgreSQL connection
+            engine = create_engine_for(database_url)
+            async with engine.connect():
+                pass
+        except Exception as e:
+            print(f"PostgreSQL connection failed: {e}")
+            print("Falling back to SQLite...")
+            if engine is not None:
+                await engine.dispose()
+            database_url = SQLITE_FALLBACK_URL
+    if not database_url.startswith("postgresql://"):
+        engine = create_engine_for(database_url)
+    SessionLocal.configure(bind=engine)
+
+async def init_database(metadata):
+    """Connect on startup, then create and upgrade tables"""
+    await connect_database()
+    async with engine.begin() as connection:
+        await connection.run_sync(metadata.create_all)
+        await connection.run_sync(upgrade_schema, metadata)
+
+async def close_database():
+    if engine is not None:
+        await engine.dispose()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
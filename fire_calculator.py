@@ -1,9 +1,109 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 import math
 import random
 
+# Bump whenever a change to the engine alters results or their shape, so cached results are not reused
+ENGINE_VERSION = "6"
+
+# Market return model used by the Monte Carlo simulation
+MARKET_RETURN_STD_DEV = 0.20
+MARKET_RETURN_FLOOR = -0.50
+MARKET_RETURN_CAP = 0.50
+
+# 'quantile' solves for the FIRE number in one sweep; 'bisection' is the reference search
+FIRE_NUMBER_SOLVERS = ('quantile', 'bisection')
+
+# Standard normal samplers: plain pseudo-random draws, antithetic pairs (z, -z) and
+# scrambled Sobol points mapped through the inverse normal CDF
+SAMPLERS = ('pseudo', 'antithetic', 'sobol')
+
+# Inputs that sensitivity_grid can sweep
+SENSITIVITY_PARAMETERS = (
+    'retirement_age', 'investment_return_rate', 'inflation_rate',
+    'retirement_expenses', 'monthly_savings', 'current_assets',
+)
+
+# Percentiles reported for the retirement fan chart
+FAN_CHART_PERCENTILES = (10, 25, 50, 75, 90)
+
+# Attributes the FIRE number simulation reads; changing any of them invalidates cached results
+SIMULATION_INPUTS = (
+    'current_age', 'retirement_age', 'retirement_expenses',
+    'investment_return_rate', 'inflation_rate', 'safe_withdrawal_rate',
+    'social_security_enabled', 'social_security_start_age', 'social_security_annual_benefit',
+    'spouse_enabled', 'spouse_age', 'spouse_social_security_enabled',
+    'spouse_social_security_start_age', 'spouse_social_security_annual_benefit',
+    'monte_carlo_runs', 'success_rate_threshold', 'life_expectancy', 'retirement_years',
+    'adaptive_sampling', 'monte_carlo_batch_size',
+    'fire_number_solver', 'seed', 'sampler',
+)
+
+# Constructor inputs that only feed the accumulation phase before retirement. Results
+# listed in RETIREMENT_PHASE_RESULTS do not depend on them, so a calculation that differs
+# from an earlier one only in these inputs can reuse that calculation's simulation
+ACCUMULATION_INPUTS = (
+    'current_assets', 'monthly_income', 'monthly_expenses', 'monthly_savings',
+    'advanced_mode', 'retirement_accounts', 'taxable_accounts', 'retirement_account_return_rate',
+    'contribution_401k_percentage', 'employer_match_percentage',
+)
+RETIREMENT_PHASE_RESULTS = ('fire_number', 'coast_fire_number', 'monte_carlo_stats')
+
+# z-score for the 95% confidence intervals used by adaptive sampling
+CONFIDENCE_Z = 1.96
+
+# Seeds are kept within a signed 32-bit integer so they fit every database backend
+MAX_SEED = 2**31 - 1
+
+class CalculationCancelled(Exception):
+    """Raised between simulation batches once a calculator's cancel_token is set"""
+
+
+def _wilson_interval(successes: int, runs: int) -> Tuple[float, float]:
+    """
+    Wilson score confidence interval for a success rate
+    """
+    if runs == 0:
+        return 0.0, 1.0
+    rate = successes / runs
+    z2 = CONFIDENCE_Z ** 2
+    center = (rate + z2 / (2 * runs)) / (1 + z2 / runs)
+    half_width = CONFIDENCE_Z * math.sqrt(rate * (1 - rate) / runs + z2 / (4 * runs ** 2)) / (1 + z2 / runs)
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+def _sample_standard_normals(sampler: str, seed: int, runs: int, years: int) -> np.ndarray:
+    """
+    Draw a (runs x years) matrix of standard normals with the given sampler
+    """
+    if sampler == 'antithetic':
+        # Interleave each path with its mirror image so every prefix stays balanced
+        pairs = np.random.default_rng(seed).standard_normal(((runs + 1) // 2, years))
+        draws = np.empty((2 * len(pairs), years))
+        draws[0::2] = pairs
+        draws[1::2] = -pairs
+        return draws[:runs]
+    
+    if sampler == 'sobol' and years > 0:
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+        
+        # Sobol points are balanced in powers of two; draw the next one up and keep a prefix
+        points = qmc.Sobol(d=years, scramble=True, seed=seed).random_base2(max(0, math.ceil(math.log2(max(runs, 1)))))
+        return ndtri(points[:runs])
+    
+    return np.random.default_rng(seed).standard_normal((runs, years))
+
+def _future_value(present_value, payment, rate, periods) -> np.ndarray:
+    """
+    Value after each number of periods of compounding with a payment added every period
+    Arguments may be scalars or broadcastable arrays
+    """
+    rate = np.asarray(rate, dtype=float)
+    growth = (1 + rate) ** periods
+    annuity_factor = np.where(rate == 0, periods, (growth - 1) / np.where(rate == 0, 1.0, rate))
+    return present_value * growth + payment * annuity_factor
+
 class FireCalculator:
     """
     Comprehensive FIRE calculator based on the existing notebook logic
@@ -39,7 +139,16 @@ class FireCalculator:
         spouse_social_security_monthly_benefit: float = 0.0,
         # 401K contribution parameters
         contribution_401k_percentage: float = 6.0,
-        employer_match_percentage: float = 50.0
+        employer_match_percentage: float = 50.0,
+        # Monte Carlo solver ('quantile' or 'bisection')
+        fire_number_solver: str = 'quantile',
+        # Seed for the shared Monte Carlo draws (a fresh one is picked when omitted)
+        seed: Optional[int] = None,
+        # Maximum Monte Carlo paths; adaptive sampling lets bisection probes stop early once decided
+        monte_carlo_runs: int = 10000,
+        adaptive_sampling: bool = True,
+        # Market return sampler ('pseudo', 'antithetic' or 'sobol')
+        sampler: str = 'pseudo'
     ):
         self.current_age = current_age
         self.retirement_age = retirement_age
@@ -93,11 +202,38 @@ class FireCalculator:
         self.total_annual_savings = self.annual_savings + self.annual_401k_contribution + self.annual_employer_match
         
         # Monte Carlo simulation parameters
-        self.monte_carlo_runs = 10000
+        self.monte_carlo_runs = monte_carlo_runs
+        self.adaptive_sampling = adaptive_sampling
+        self.monte_carlo_batch_size = 500
         self.success_rate_threshold = 0.90  # 90% success rate target
+        if fire_number_solver not in FIRE_NUMBER_SOLVERS:
+            raise ValueError(f"Unknown FIRE number solver: {fire_number_solver}")
+        self.fire_number_solver = fire_number_solver
+        if sampler not in SAMPLERS:
+            raise ValueError(f"Unknown sampler: {sampler}")
+        self.sampler = sampler
+        
+        # Common random numbers: one seeded matrix of standard normal draws is reused by
+        # every probe and what-if scenario on this calculator, so results are reproducible
+        self.seed = seed if seed is not None else int(np.random.default_rng().integers(MAX_SEED + 1))
+        self._standard_normals_cache: Dict[Tuple[int, str, int, int], np.ndarray] = {}
+        
+        # FIRE number results keyed on SIMULATION_INPUTS, so each distinct simulation runs once
+        self._fire_number_cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self.simulation_counters = {
+            'fire_number_calls': 0,
+            'cache_hits': 0,
+            'simulations_run': 0,
+            'paths_simulated': 0
+        }
         self.life_expectancy = self._calculate_life_expectancy(current_age)
         self.retirement_years = self.life_expectancy - retirement_age
         
+        # Called with a dict after every simulation batch when set (see _report_progress)
+        self.progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+        # Any object with is_set() (e.g. threading.Event); checked between simulation batches
+        self.cancel_token: Optional[Any] = None
+        
     def _calculate_life_expectancy(self, current_age: int) -> int:
         """
         Calculate life expectancy based on current age
@@ -119,143 +255,571 @@ class FireCalculator:
     
     def _generate_market_returns(self, years: int) -> List[float]:
         """
-        Generate random market returns for Monte Carlo simulation
+        Generate random market returns for a single Monte Carlo path
         Based on historical market data: mean ~7%, std dev ~20%
         """
-        returns = []
-        for _ in range(years):
-            # Normal distribution with some adjustments for market realism
-            annual_return = np.random.normal(self.investment_return_rate, 0.20)
-            # Cap extreme values (market rarely goes below -50% or above +50% in a year)
-            annual_return = max(-0.50, min(0.50, annual_return))
-            returns.append(annual_return)
-        return returns
+        return self._generate_market_returns_matrix(1, years)[0].tolist()
     
-    def _simulate_retirement_scenario(self, initial_portfolio: float) -> bool:
+    def _standard_normals(self, runs: int, years: int) -> np.ndarray:
         """
-        Simulate a single retirement scenario
-        Returns True if portfolio survives the retirement period
+        Seeded (runs x years) matrix of standard normal draws, generated once per run count
+        Rows are drawn in order, so a smaller run count sees a prefix of the same paths.
+        Columns are always drawn out to life expectancy and sliced, so every retirement
+        age (the calculation, the retirement-age curve, sensitivity grids) starts its
+        retirement on the same paths.
+        """
+        width = max(years, self.life_expectancy - self.current_age)
+        key = (self.seed, self.sampler, runs, width)
+        draws = self._standard_normals_cache.get(key)
+        if draws is None:
+            draws = _sample_standard_normals(self.sampler, self.seed, runs, width)
+            self._standard_normals_cache[key] = draws
+        return draws[:, :years]
+    
+    def _generate_market_returns_matrix(self, runs: int, years: int) -> np.ndarray:
+        """
+        Generate a (runs x years) matrix of market returns from the shared draws
+        Each row is one Monte Carlo path through the retirement period
+        """
+        # Normal distribution with some adjustments for market realism
+        returns = self.investment_return_rate + MARKET_RETURN_STD_DEV * self._standard_normals(runs, years)
+        # Cap extreme values (market rarely goes below -50% or above +50% in a year)
+        return np.clip(returns, MARKET_RETURN_FLOOR, MARKET_RETURN_CAP)
+    
+    def _retirement_income_schedule(
+        self,
+        years: int,
+        start_year: int = 0,
+        retirement_age=None,
+        retirement_expenses=None,
+        inflation_rate=None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Inflation-adjusted expenses and Social Security benefits for consecutive
+        retirement years, starting start_year years after the retirement age
+        Retirement inputs default to this calculator's; (n, 1) arrays give one row per scenario
         """
-        portfolio = initial_portfolio
-        annual_expenses = self.retirement_expenses
+        retirement_age = self.retirement_age if retirement_age is None else retirement_age
+        retirement_expenses = self.retirement_expenses if retirement_expenses is None else retirement_expenses
+        inflation_rate = self.inflation_rate if inflation_rate is None else inflation_rate
         
-        # Generate random returns for retirement period
-        returns = self._generate_market_returns(int(self.retirement_years))
+        year = start_year + np.arange(years)
+        ages = retirement_age + year
         
-        # Calculate Social Security benefits
-        total_ss_benefits = 0
+        # Apply inflation to expenses
+        inflation_adjusted_expenses = retirement_expenses * ((1 + inflation_rate) ** year)
+        
+        ss_benefits = np.zeros(np.broadcast_shapes(np.shape(ages), np.shape(inflation_adjusted_expenses)))
+        
+        # Primary Social Security
         if self.social_security_enabled:
-            total_ss_benefits += self.social_security_annual_benefit
+            ss_benefits += np.where(ages >= self.social_security_start_age, self.social_security_annual_benefit, 0.0)
+        
+        # Spouse Social Security (based on spouse's age, not primary age)
         if self.spouse_enabled and self.spouse_social_security_enabled:
-            total_ss_benefits += self.spouse_social_security_annual_benefit
+            spouse_ages = self.spouse_age + (ages - self.current_age)
+            ss_benefits += np.where(spouse_ages >= self.spouse_social_security_start_age, self.spouse_social_security_annual_benefit, 0.0)
         
-        for year, annual_return in enumerate(returns):
-            current_age = self.retirement_age + year
-            
-            # Apply inflation to expenses
-            inflation_adjusted_expenses = annual_expenses * ((1 + self.inflation_rate) ** year)
-            
-            # Apply Social Security benefits if age appropriate
-            net_expenses = inflation_adjusted_expenses
-            ss_benefit_this_year = 0
-            
-            # Primary Social Security
-            if self.social_security_enabled and current_age >= self.social_security_start_age:
-                ss_benefit_this_year += self.social_security_annual_benefit
-            
-            # Spouse Social Security
-            if self.spouse_enabled and self.spouse_social_security_enabled:
-                spouse_age = self.spouse_age + (current_age - self.current_age)
-                if spouse_age >= self.spouse_social_security_start_age:
-                    ss_benefit_this_year += self.spouse_social_security_annual_benefit
-            
-            net_expenses = max(0, inflation_adjusted_expenses - ss_benefit_this_year)
-            
+        return inflation_adjusted_expenses, ss_benefits
+    
+    def _retirement_expense_schedule(self, years: int) -> np.ndarray:
+        """
+        Net portfolio withdrawal for each retirement year:
+        inflation-adjusted expenses minus any Social Security received that year
+        """
+        inflation_adjusted_expenses, ss_benefits = self._retirement_income_schedule(years)
+        return np.maximum(0.0, inflation_adjusted_expenses - ss_benefits)
+    
+    def _simulate_retirement_scenario(self, initial_portfolio: float) -> bool:
+        """
+        Simulate a single retirement scenario
+        Returns True if portfolio survives the retirement period
+        """
+        returns = self._generate_market_returns_matrix(1, max(0, int(self.retirement_years)))
+        return bool(self._simulate_retirement_scenarios(initial_portfolio, returns)[0])
+    
+    def _simulate_retirement_scenarios(self, initial_portfolio: float, returns: np.ndarray) -> np.ndarray:
+        """
+        Simulate every path of a (runs x years) return matrix at once
+        Returns a boolean array marking the paths whose portfolio survives the retirement period
+        """
+        runs, years = returns.shape
+        net_expenses = self._retirement_expense_schedule(years)
+        
+        portfolios = np.full(runs, float(initial_portfolio))
+        survived = np.ones(runs, dtype=bool)
+        
+        for year in range(years):
             # Withdraw from portfolio first, then apply market return
-            portfolio -= net_expenses
-            if portfolio <= 0:
-                return False  # Portfolio depleted
-            
-            # Apply market return to remaining portfolio
-            portfolio *= (1 + annual_return)
+            portfolios -= net_expenses[year]
+            survived &= portfolios > 0
             
-            # Portfolio can't go negative
-            if portfolio <= 0:
-                return False
+            # Depleted paths stay non-positive, so they can never recover below
+            portfolios *= (1 + returns[:, year])
+            survived &= portfolios > 0
         
-        return True  # Successfully survived retirement period
+        return survived
+    
+    def _required_starting_portfolios(self, returns: np.ndarray) -> np.ndarray:
+        """
+        Smallest starting portfolio each path of a (runs x years) return matrix needs
+        to survive retirement. Withdrawals are fixed and returns multiply, so walking
+        backward through a path gives it in closed form:
+        required[t] = expenses[t] + required[t + 1] / (1 + return[t])
+        """
+        runs, years = returns.shape
+        net_expenses = self._retirement_expense_schedule(years)
+        
+        required = np.zeros(runs)
+        for year in range(years - 1, -1, -1):
+            required = net_expenses[year] + required / (1 + returns[:, year])
+        
+        return required
+    
+    def _check_cancelled(self) -> None:
+        """Stop the calculation if its cancel_token has been set"""
+        if self.cancel_token is not None and self.cancel_token.is_set():
+            raise CalculationCancelled()
+    
+    def _report_progress(self, stage: str, **details: Any) -> None:
+        """Pass a progress event to progress_callback, if one is set"""
+        if self.progress_callback is not None:
+            self.progress_callback({'stage': stage, **details})
     
     def calculate_monte_carlo_fire_number(self) -> Tuple[float, Dict[str, Any]]:
         """
         Use Monte Carlo simulation to find FIRE number with target success rate
         Returns the FIRE number and simulation statistics
         """
+        if self.fire_number_solver == 'bisection':
+            return self._bisect_monte_carlo_fire_number()
+        return self._quantile_monte_carlo_fire_number()
+    
+    def _quantile_monte_carlo_fire_number(self) -> Tuple[float, Dict[str, Any]]:
+        """
+        Single-sweep solver: the FIRE number is the success-rate quantile of the
+        starting portfolio each simulated path requires
+        """
+        returns = self._generate_market_returns_matrix(self.monte_carlo_runs, max(0, int(self.retirement_years)))
+        
+        # Paths are independent, so walking them in batches gives the same result;
+        # batches are only used when someone is listening for progress or cancellation
+        runs = len(returns)
+        listening = self.progress_callback is not None or self.cancel_token is not None
+        batch_size = self.monte_carlo_batch_size if listening else runs
+        required = np.empty(runs)
+        for batch, start in enumerate(range(0, runs, batch_size), start=1):
+            self._check_cancelled()
+            stop = min(runs, start + batch_size)
+            required[start:stop] = self._required_starting_portfolios(returns[start:stop])
+            if self.progress_callback is not None and stop < runs:
+                # The provisional interval narrows as paths accumulate
+                provisional, provisional_low, provisional_high = self._quantile_interval(np.sort(required[:stop]))
+                self._report_progress(
+                    'fire_number',
+                    batches_completed=batch,
+                    paths_completed=stop,
+                    max_simulations=runs,
+                    fire_number=provisional,
+                    fire_number_interval=[provisional_low, provisional_high]
+                )
+        self.simulation_counters['paths_simulated'] += runs
+        
+        fire_number, fire_low, fire_high = self._quantile_interval(np.sort(required))
+        
+        # The share of paths the quantile covers is the threshold by construction, so no
+        # success rate is reported here; calculate_all adds the projected portfolio's
+        simulation_stats = {
+            'fire_number': fire_number,
+            'retirement_years': self.retirement_years,
+            'life_expectancy': self.life_expectancy,
+            'simulations_run': runs,
+            'max_simulations': self.monte_carlo_runs,
+            'fire_number_interval': [fire_low, fire_high],
+            'solver': 'quantile',
+            'seed': self.seed,
+            'sampler': self.sampler
+        }
+        
+        return fire_number, simulation_stats
+    
+    def _quantile_interval(self, sorted_required: np.ndarray) -> Tuple[float, float, float]:
+        """
+        Success-rate quantile of the sorted required portfolios, with a distribution-free
+        confidence interval from the normal approximation to the order statistic ranks
+        """
+        n = len(sorted_required)
+        p = self.success_rate_threshold
+        
+        # Smallest portfolio that covers at least the threshold share of paths
+        rank = max(0, math.ceil(p * n) - 1)
+        half_width = CONFIDENCE_Z * math.sqrt(n * p * (1 - p))
+        low_rank = max(0, math.floor(rank - half_width))
+        high_rank = min(n - 1, math.ceil(rank + half_width))
+        
+        return float(sorted_required[rank]), float(sorted_required[low_rank]), float(sorted_required[high_rank])
+    
+    def _estimate_success_rate(self, initial_portfolio: float, returns: np.ndarray) -> Tuple[float, int, Tuple[float, float]]:
+        """
+        Sequentially simulate growing batches of paths until the success rate's confidence
+        interval lies clearly on one side of the threshold, or every path has run
+        Returns the success rate, the paths used and the confidence interval
+        """
+        total_runs = returns.shape[0]
+        batch_size = self.monte_carlo_batch_size if self.adaptive_sampling else total_runs
+        
+        successes = 0
+        runs = 0
+        while runs < total_runs:
+            self._check_cancelled()
+            batch = returns[runs:runs + batch_size]
+            successes += int(np.count_nonzero(self._simulate_retirement_scenarios(initial_portfolio, batch)))
+            runs += len(batch)
+            
+            low, high = _wilson_interval(successes, runs)
+            if low >= self.success_rate_threshold or high < self.success_rate_threshold:
+                break
+            
+            # Undecided probes sit near the threshold; grow batches to limit per-batch overhead
+            batch_size *= 2
+        
+        self.simulation_counters['paths_simulated'] += runs
+        return successes / runs, runs, _wilson_interval(successes, runs)
+    
+    def _bisect_monte_carlo_fire_number(self) -> Tuple[float, Dict[str, Any]]:
+        """
+        Reference solver: binary search on the FIRE number, running a set of
+        simulations at every probe. Kept for validating the quantile solver.
+        """
+        def probe_stats(fire_number, success_rate, runs, low, high):
+            return {
+                'success_rate': success_rate,
+                'fire_number': fire_number,
+                'retirement_years': self.retirement_years,
+                'life_expectancy': self.life_expectancy,
+                'simulations_run': runs,
+                'max_simulations': self.monte_carlo_runs,
+                'confidence_interval': [low, high],
+                'interval_width': high - low,
+                'solver': 'bisection',
+                'seed': self.seed,
+                'sampler': self.sampler
+            }
+        
+        # No retirement years means nothing to withdraw, as in the quantile solver
+        if self.retirement_years <= 0:
+            return 0.0, probe_stats(0.0, 1.0, 0, 1.0, 1.0)
+        
         # Start with traditional 4% rule as initial guess
         traditional_fire = self.retirement_expenses / self.safe_withdrawal_rate
-        
-        # Binary search for optimal FIRE number
-        low_fire = traditional_fire * 0.5
-        high_fire = traditional_fire * 2.0
         tolerance = 1000  # $1,000 tolerance
         
-        best_fire_number = traditional_fire
-        simulation_stats = {}
+        # Every probe reuses the same return paths (common random numbers)
+        returns = self._generate_market_returns_matrix(self.monte_carlo_runs, max(0, int(self.retirement_years)))
+        
+        # Double the upper bound until it succeeds, so the answer is never clipped to the guess
+        low_fire = 0.0
+        high_fire = max(traditional_fire * 2.0, tolerance)
+        probes = 0
+        while True:
+            success_rate, runs, (low, high) = self._estimate_success_rate(high_fire, returns)
+            probes += 1
+            if success_rate >= self.success_rate_threshold:
+                break
+            low_fire = high_fire
+            high_fire *= 2
+        best_fire_number = high_fire
+        simulation_stats = probe_stats(high_fire, success_rate, runs, low, high)
         
+        # Binary search for optimal FIRE number
         while high_fire - low_fire > tolerance:
             test_fire = (low_fire + high_fire) / 2
             
-            # Run Monte Carlo simulation for this FIRE number
-            successes = 0
-            for _ in range(self.monte_carlo_runs):
-                if self._simulate_retirement_scenario(test_fire):
-                    successes += 1
-            
-            success_rate = successes / self.monte_carlo_runs
+            # Simulate only as many paths as this probe needs to decide
+            success_rate, runs, (low, high) = self._estimate_success_rate(test_fire, returns)
+            probes += 1
             
             if success_rate >= self.success_rate_threshold:
                 # Success rate is high enough, try lower FIRE number
                 high_fire = test_fire
                 best_fire_number = test_fire
-                simulation_stats = {
-                    'success_rate': success_rate,
-                    'fire_number': test_fire,
-                    'retirement_years': self.retirement_years,
-                    'life_expectancy': self.life_expectancy,
-                    'simulations_run': self.monte_carlo_runs
-                }
+                simulation_stats = probe_stats(test_fire, success_rate, runs, low, high)
             else:
                 # Success rate too low, need higher FIRE number
                 low_fire = test_fire
-        
-        # If no simulation stats were saved (shouldn't happen), create default
-        if not simulation_stats:
-            simulation_stats = {
-                'success_rate': 0.0,
-                'fire_number': best_fire_number,
-                'retirement_years': self.retirement_years,
-                'life_expectancy': self.life_expectancy,
-                'simulations_run': self.monte_carlo_runs
-            }
+            
+            self._report_progress(
+                'fire_number',
+                batches_completed=probes,
+                paths_completed=runs,
+                max_simulations=self.monte_carlo_runs,
+                success_rate=success_rate,
+                confidence_interval=[low, high],
+                probe=test_fire,
+                fire_number=high_fire,
+                fire_number_interval=[low_fire, high_fire]
+            )
         
         return best_fire_number, simulation_stats
-
+    
+    def calculate_percentile_trajectories(self, initial_portfolio: float) -> Dict[str, List[float]]:
+        """
+        Portfolio percentiles by age through retirement for a fan chart, simulated
+        over the same return paths as the FIRE number. Quantiles are taken year by
+        year, so only the current year's portfolios are ever held in memory.
+        """
+        years = max(0, int(self.retirement_years))
+        returns = self._generate_market_returns_matrix(self.monte_carlo_runs, years)
+        net_expenses = self._retirement_expense_schedule(years)
+        
+        portfolios = np.full(self.monte_carlo_runs, float(initial_portfolio))
+        bands = np.empty((len(FAN_CHART_PERCENTILES), years + 1))
+        bands[:, 0] = portfolios[0]
+        
+        for year in range(years):
+            # Depleted portfolios stay at zero
+            portfolios = np.maximum(0.0, portfolios - net_expenses[year]) * (1 + returns[:, year])
+            bands[:, year + 1] = np.percentile(portfolios, FAN_CHART_PERCENTILES)
+        
+        trajectories = {'ages': list(range(self.retirement_age, self.retirement_age + years + 1))}
+        for percentile, band in zip(FAN_CHART_PERCENTILES, bands):
+            trajectories[f'p{percentile}'] = band.tolist()
+        return trajectories
+    
+    def calculate_plan_success_rate(self, initial_portfolio: float) -> Tuple[float, Tuple[float, float]]:
+        """
+        Share of the FIRE number's return paths on which initial_portfolio lasts
+        through retirement, with its 95% Wilson interval
+        """
+        returns = self._generate_market_returns_matrix(self.monte_carlo_runs, max(0, int(self.retirement_years)))
+        successes = int(np.count_nonzero(self._simulate_retirement_scenarios(initial_portfolio, returns)))
+        self.simulation_counters['paths_simulated'] += self.monte_carlo_runs
+        return successes / self.monte_carlo_runs, _wilson_interval(successes, self.monte_carlo_runs)
+    
+    def sensitivity_grid(
+        self,
+        x_parameter: str,
+        x_values: List[float],
+        y_parameter: Optional[str] = None,
+        y_values: Optional[List[float]] = None,
+        runs: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Sweep one or two inputs over a grid of values and return, for every cell,
+        the FIRE number, the success rate of the portfolio projected at retirement
+        and the years to FIRE. Each cell holds the other inputs at this calculator's
+        values; matrices are indexed [x][y] (or [x] for a one-dimensional sweep).
+        All cells are evaluated together over one set of return paths.
+        safe_withdrawal_rate cannot be swept: the simulated FIRE number does not
+        depend on it, it only feeds the traditional 4% rule fallback.
+        """
+        for name in (x_parameter, y_parameter):
+            if name is not None and name not in SENSITIVITY_PARAMETERS:
+                raise ValueError(f"Cannot sweep {name}; choose from {', '.join(SENSITIVITY_PARAMETERS)}")
+            if name == 'current_assets' and self.advanced_mode:
+                raise ValueError("Advanced mode ignores current_assets; it cannot be swept")
+        if x_parameter == y_parameter:
+            raise ValueError("Sweep two different parameters")
+        
+        xs = np.asarray(x_values, dtype=float)
+        ys = np.asarray(y_values if y_parameter else [np.nan], dtype=float)
+        grid_x, grid_y = np.meshgrid(xs, ys, indexing='ij')
+        
+        scenarios = {name: np.full(grid_x.size, float(getattr(self, name))) for name in SENSITIVITY_PARAMETERS}
+        scenarios[x_parameter] = grid_x.ravel()
+        if y_parameter:
+            scenarios[y_parameter] = grid_y.ravel()
+        scenarios['retirement_age'] = np.floor(scenarios['retirement_age'])
+        
+        fire_numbers, success_rates, years_to_fire = self._evaluate_scenarios(scenarios, runs or self.monte_carlo_runs)
+        
+        def to_grid(values: np.ndarray) -> list:
+            grid = values.reshape(grid_x.shape)
+            grid = np.where(np.isfinite(grid), grid, np.nan)
+            rows = [[None if math.isnan(value) else value for value in row] for row in grid.tolist()]
+            return [row[0] for row in rows] if y_parameter is None else rows
+        
+        return {
+            'x_parameter': x_parameter,
+            'x_values': xs.tolist(),
+            'y_parameter': y_parameter,
+            'y_values': ys.tolist() if y_parameter else None,
+            'fire_number': to_grid(fire_numbers),
+            'success_rate': to_grid(success_rates),
+            'years_to_fire': to_grid(years_to_fire),
+            'simulations_run': runs or self.monte_carlo_runs,
+            'seed': self.seed
+        }
+    
+    def _evaluate_scenarios(self, scenarios: Dict[str, np.ndarray], runs: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized FIRE number, success rate and years to FIRE for many variants of this
+        calculator at once. scenarios maps each SENSITIVITY_PARAMETERS input to an array
+        with one value per scenario.
+        """
+        retirement_ages = scenarios['retirement_age']
+        return_rates = scenarios['investment_return_rate']
+        
+        # Pad every scenario's withdrawal schedule to the longest retirement; padding
+        # years withdraw nothing, so they do not change the required portfolio
+        horizons = np.maximum(0, self.life_expectancy - retirement_ages)
+        years = int(horizons.max()) if len(horizons) else 0
+        inflation_adjusted_expenses, ss_benefits = self._retirement_income_schedule(
+            years,
+            retirement_age=retirement_ages[:, None],
+            retirement_expenses=scenarios['retirement_expenses'][:, None],
+            inflation_rate=scenarios['inflation_rate'][:, None]
+        )
+        net_expenses = np.maximum(0.0, inflation_adjusted_expenses - ss_benefits)
+        net_expenses[np.arange(years)[None, :] >= horizons[:, None]] = 0.0
+        
+        # Scenarios sharing a return rate share one return matrix; walk them backward together
+        draws = self._standard_normals(runs, years)
+        required = np.empty((len(retirement_ages), runs))
+        for return_rate in np.unique(return_rates):
+            self._check_cancelled()
+            members = np.flatnonzero(return_rates == return_rate)
+            growth = 1 + np.clip(return_rate + MARKET_RETURN_STD_DEV * draws, MARKET_RETURN_FLOOR, MARKET_RETURN_CAP)
+            group_required = np.zeros((len(members), runs))
+            for year in range(years - 1, -1, -1):
+                group_required = net_expenses[members, year, None] + group_required / growth[:, year]
+            required[members] = group_required
+        self.simulation_counters['paths_simulated'] += runs * len(retirement_ages)
+        
+        fire_numbers = np.quantile(required, self.success_rate_threshold, axis=1, method='inverted_cdf')
+        
+        # Deterministic accumulation up to each scenario's retirement age
+        working_years = np.maximum(0, retirement_ages - self.current_age)
+        annual_savings = scenarios['monthly_savings'] * 12
+        total_annual_savings = annual_savings + self.annual_401k_contribution + self.annual_employer_match
+        if self.advanced_mode:
+            current_assets = np.full(len(retirement_ages), self.current_assets)
+        else:
+            current_assets = scenarios['current_assets']
+        retirement_assets = self._projected_retirement_assets(working_years, annual_savings, return_rates, current_assets)
+        success_rates = np.mean(required <= retirement_assets[:, None], axis=1)
+        
+        # Years to FIRE: FV = PV(1+r)^t + PMT[((1+r)^t - 1)/r] solved for t
+        with np.errstate(divide='ignore', invalid='ignore'):
+            safe_rates = np.where(return_rates == 0, 1.0, return_rates)
+            growth_years = np.log((fire_numbers * safe_rates + total_annual_savings) / (current_assets * safe_rates + total_annual_savings)) / np.log(1 + safe_rates)
+            linear_years = (fire_numbers - current_assets) / total_annual_savings
+            years_to_fire = np.where(return_rates == 0, linear_years, np.maximum(0, growth_years))
+        years_to_fire = np.where((total_annual_savings > 0) & np.isfinite(years_to_fire), years_to_fire, np.inf)
+        
+        return fire_numbers, success_rates, years_to_fire
+    
+    def _projected_retirement_assets(self, working_years, annual_savings, return_rates, current_assets) -> np.ndarray:
+        """
+        Assets at retirement after working_years of deterministic growth and saving,
+        broadcast over array arguments. Advanced mode grows the retirement and taxable
+        accounts separately and ignores current_assets.
+        """
+        if self.advanced_mode:
+            retirement_contribution = (annual_savings * 0.5) + self.annual_401k_contribution + self.annual_employer_match
+            return (
+                _future_value(self.retirement_accounts, retirement_contribution, self.retirement_account_return_rate, working_years)
+                + _future_value(self.taxable_accounts, annual_savings * 0.5, return_rates, working_years)
+            )
+        total_annual_savings = annual_savings + self.annual_401k_contribution + self.annual_employer_match
+        return _future_value(current_assets, total_annual_savings, return_rates, working_years)
+    
+    def retirement_age_curve(self, runs: Optional[int] = None) -> Dict[str, Any]:
+        """
+        FIRE number, Coast FIRE number and success rate for every retirement age from
+        current_age + 1 to 100, so the retirement-age slider can be scrubbed without
+        new simulations. Each age's retirement starts on the same return paths as
+        calculate_all's, so with the same seed the curve matches it at every age.
+        With D[k] the product of the discount factors 1 / (1 + return) before
+        retirement year k, the portfolio a path needs is sum(expenses[k] * D[k]), so
+        every age comes out of a single matrix product.
+        """
+        runs = runs or self.monte_carlo_runs
+        ages = np.arange(self.current_age + 1, 101)
+        start_years = ages - self.current_age
+        horizons = np.maximum(0, self.life_expectancy - ages)
+        years = int(horizons.max()) if len(horizons) else 0
+        
+        # Net withdrawals by retirement age (rows) and year since retirement (columns);
+        # years past life expectancy withdraw nothing
+        inflation_adjusted_expenses, ss_benefits = self._retirement_income_schedule(
+            years,
+            retirement_age=ages[:, None]
+        )
+        net_expenses = np.maximum(0.0, inflation_adjusted_expenses - ss_benefits)
+        net_expenses[np.arange(years)[None, :] >= horizons[:, None]] = 0.0
+        
+        returns = self._generate_market_returns_matrix(runs, years)
+        discounts = np.ones((runs, years))
+        np.cumprod(1 / (1 + returns[:, :-1]), axis=1, out=discounts[:, 1:])
+        required = discounts @ net_expenses.T
+        self.simulation_counters['paths_simulated'] += runs
+        
+        fire_numbers = np.quantile(required, self.success_rate_threshold, axis=0, method='inverted_cdf')
+        real_return_rate = self.investment_return_rate - self.inflation_rate
+        coast_fire_numbers = fire_numbers / ((1 + real_return_rate) ** start_years)
+        retirement_assets = self._projected_retirement_assets(
+            start_years, self.monthly_savings * 12, self.investment_return_rate, self.current_assets
+        )
+        success_rates = np.mean(required <= retirement_assets[None, :], axis=0)
+        
+        return {
+            'ages': ages.tolist(),
+            'fire_number': fire_numbers.tolist(),
+            'coast_fire_number': coast_fire_numbers.tolist(),
+            'success_rate': success_rates.tolist(),
+            'life_expectancy': self.life_expectancy,
+            'simulations_run': runs,
+            'seed': self.seed
+        }
+    
+    def _simulation_key(self) -> Tuple:
+        """
+        Cache key for the FIRE number: the current value of every simulation input
+        """
+        return tuple(getattr(self, name) for name in SIMULATION_INPUTS)
+    
+    def reuse_retirement_phase(self, retirement_phase: Dict[str, Any]) -> None:
+        """
+        Seed the FIRE number cache with the RETIREMENT_PHASE_RESULTS of an earlier
+        calculation whose inputs differed only in ACCUMULATION_INPUTS, adopting its
+        seed so the fan chart is drawn from the same paths. Only the accumulation
+        projection and what depends on it are then recomputed.
+        """
+        simulation_stats = retirement_phase['monte_carlo_stats']
+        self.seed = simulation_stats['seed']
+        self._fire_number_cache[self._simulation_key()] = (retirement_phase['fire_number'], simulation_stats)
+    
     def calculate_fire_number(self) -> float:
         """
         Calculate the FIRE number using Monte Carlo simulation for more accurate results
         Falls back to traditional 4% rule if simulation fails
+        Results are memoized per distinct set of simulation inputs
         """
+        self.simulation_counters['fire_number_calls'] += 1
+        key = self._simulation_key()
+        cached = self._fire_number_cache.get(key)
+        if cached is not None:
+            self.simulation_counters['cache_hits'] += 1
+            fire_number, self.last_simulation_stats = cached
+            return fire_number
+        
+        self.simulation_counters['simulations_run'] += 1
         try:
             # Use Monte Carlo simulation for more accurate FIRE number
-            monte_carlo_fire, simulation_stats = self.calculate_monte_carlo_fire_number()
-            
-            # Store simulation stats for later use
-            self.last_simulation_stats = simulation_stats
-            
-            return monte_carlo_fire
+            fire_number, simulation_stats = self.calculate_monte_carlo_fire_number()
+        except CalculationCancelled:
+            raise
         except Exception as e:
             # Fallback to traditional calculation if Monte Carlo fails
             print(f"Monte Carlo simulation failed, using traditional method: {e}")
-            return self._calculate_traditional_fire_number()
+            fire_number, simulation_stats = self._calculate_traditional_fire_number(), None
+        
+        # Store simulation stats for later use
+        self.last_simulation_stats = simulation_stats
+        self._fire_number_cache[key] = (fire_number, simulation_stats)
+        
+        return fire_number
     
     def _calculate_traditional_fire_number(self) -> float:
         """
@@ -368,132 +932,120 @@ class FireCalculator:
         except (ValueError, ZeroDivisionError):
             return float('inf')
     
-    def project_assets_over_time(self) -> pd.DataFrame:
+    def project_assets_columns(self) -> Dict[str, np.ndarray]:
         """
         Project asset growth over time with advanced mode support
-        Returns a DataFrame with year-by-year projections
+        Returns year-by-year projections as columns of preallocated NumPy arrays
         """
-        years = range(self.years_to_project + 1)
-        data = []
+        rows = self.years_to_project + 1
+        year = np.arange(rows)
+        ages = self.current_age + year
+        working_years = min(max(0, self.retirement_age - self.current_age), rows)
+        retired_years = rows - working_years
         
-        # Initialize assets
+        retirement_accounts = np.zeros(rows)
+        taxable_accounts = np.zeros(rows)
+        total_assets = np.zeros(rows)
+        
+        # Working years: growth plus contributions, recorded at the end of each year
+        periods = year[:working_years] + 1
         if self.advanced_mode:
-            current_retirement_accounts = self.retirement_accounts
-            current_taxable_accounts = self.taxable_accounts
-            current_assets = current_retirement_accounts + current_taxable_accounts
+            # 401K contributions go to retirement accounts, regular savings split
+            retirement_contribution = (self.annual_savings * 0.5) + self.annual_401k_contribution + self.annual_employer_match
+            taxable_contribution = self.annual_savings * 0.5
+            retirement_accounts[:working_years] = _future_value(self.retirement_accounts, retirement_contribution, self.retirement_account_return_rate, periods)
+            taxable_accounts[:working_years] = _future_value(self.taxable_accounts, taxable_contribution, self.investment_return_rate, periods)
+            total_assets[:working_years] = retirement_accounts[:working_years] + taxable_accounts[:working_years]
         else:
-            current_retirement_accounts = 0.0
-            current_taxable_accounts = self.current_assets
-            current_assets = self.current_assets
-        
-        current_expenses = self.retirement_expenses
-        age = self.current_age
-        
-        for year in years:
-            if age < self.retirement_age:
-                # Still working and saving
-                if self.advanced_mode:
-                    # Grow retirement and taxable accounts separately
-                    retirement_growth = current_retirement_accounts * self.retirement_account_return_rate
-                    taxable_growth = current_taxable_accounts * self.investment_return_rate
-                    
-                    # 401K contributions go to retirement accounts, regular savings split
-                    retirement_contribution = (self.annual_savings * 0.5) + self.annual_401k_contribution + self.annual_employer_match
-                    taxable_contribution = self.annual_savings * 0.5
-                    
-                    current_retirement_accounts += retirement_growth + retirement_contribution
-                    current_taxable_accounts += taxable_growth + taxable_contribution
-                    current_assets = current_retirement_accounts + current_taxable_accounts
+            # Simple growth - include all savings (regular + 401K + match)
+            total_assets[:working_years] = _future_value(self.current_assets, self.total_annual_savings, self.investment_return_rate, periods)
+        
+        # Retired years: withdraw net expenses after Social Security
+        inflation_adjusted_expenses, ss_benefits = self._retirement_income_schedule(
+            retired_years, start_year=max(0, self.current_age - self.retirement_age)
+        )
+        net_expenses = np.maximum(0.0, inflation_adjusted_expenses - ss_benefits)
+        
+        if retired_years:
+            if self.advanced_mode:
+                if working_years:
+                    current_retirement_accounts = retirement_accounts[working_years - 1]
+                    current_taxable_accounts = taxable_accounts[working_years - 1]
                 else:
-                    # Simple growth - include all savings (regular + 401K + match)
-                    asset_growth = current_assets * self.investment_return_rate
-                    current_assets = current_assets + asset_growth + self.total_annual_savings
-                
-            else:
-                # Retired, need to withdraw from assets
-                inflation_adjusted_expenses = current_expenses * ((1 + self.inflation_rate) ** (age - self.retirement_age))
-                
-                # Apply Social Security benefits if enabled and age appropriate
-                net_expenses = inflation_adjusted_expenses
-                total_social_security_benefit = 0
+                    current_retirement_accounts = self.retirement_accounts
+                    current_taxable_accounts = self.taxable_accounts
                 
-                # Primary Social Security
-                if self.social_security_enabled and age >= self.social_security_start_age:
-                    total_social_security_benefit += self.social_security_annual_benefit
-                
-                # Spouse Social Security (based on spouse's age, not primary age)
-                if self.spouse_enabled and self.spouse_social_security_enabled:
-                    spouse_current_age = self.spouse_age + (age - self.current_age)  # Calculate spouse's age at this point
-                    if spouse_current_age >= self.spouse_social_security_start_age:
-                        total_social_security_benefit += self.spouse_social_security_annual_benefit
-                
-                net_expenses = max(0, inflation_adjusted_expenses - total_social_security_benefit)
-                
-                if self.advanced_mode:
-                    # Grow accounts
-                    retirement_growth = current_retirement_accounts * self.retirement_account_return_rate
-                    taxable_growth = current_taxable_accounts * self.investment_return_rate
-                    current_retirement_accounts += retirement_growth
-                    current_taxable_accounts += taxable_growth
+                # The withdrawal order depends on balances, so step through the years
+                for offset, age in enumerate(ages[working_years:].tolist()):
+                    current_retirement_accounts *= 1 + self.retirement_account_return_rate
+                    current_taxable_accounts *= 1 + self.investment_return_rate
+                    withdrawal = net_expenses[offset]
                     
                     # Withdrawal strategy: taxable first until age 65, then retirement accounts
-                    if age < 65:
-                        # Can only withdraw from taxable accounts
-                        current_taxable_accounts = max(0, current_taxable_accounts - net_expenses)
+                    if age < 65 or current_taxable_accounts >= withdrawal:
+                        current_taxable_accounts = max(0.0, current_taxable_accounts - withdrawal)
                     else:
-                        # Can withdraw from retirement accounts
-                        if current_taxable_accounts >= net_expenses:
-                            # Use taxable first if available
-                            current_taxable_accounts -= net_expenses
-                        else:
-                            # Use taxable then retirement
-                            remaining_needed = net_expenses - current_taxable_accounts
-                            current_taxable_accounts = 0
-                            current_retirement_accounts = max(0, current_retirement_accounts - remaining_needed)
+                        current_retirement_accounts = max(0.0, current_retirement_accounts - (withdrawal - current_taxable_accounts))
+                        current_taxable_accounts = 0.0
                     
-                    current_assets = current_retirement_accounts + current_taxable_accounts
-                else:
-                    # Simple withdrawal
-                    asset_growth = current_assets * self.investment_return_rate
-                    current_assets = current_assets + asset_growth - net_expenses
+                    retirement_accounts[working_years + offset] = current_retirement_accounts
+                    taxable_accounts[working_years + offset] = current_taxable_accounts
                 
-                current_expenses = net_expenses + total_social_security_benefit  # Total expenses covered
-            
-            # Coast FIRE milestone for this age
-            years_left_to_retirement = max(0, self.retirement_age - age)
-            if years_left_to_retirement > 0:
-                real_return_rate = self.investment_return_rate - self.inflation_rate
-                coast_fire_milestone = self.calculate_fire_number() / ((1 + real_return_rate) ** years_left_to_retirement)
-            else:
-                coast_fire_milestone = self.calculate_fire_number()
-            
-            # Calculate accessible assets (for early retirement scenarios)
-            if self.advanced_mode and age < 65:
-                accessible_assets = current_taxable_accounts  # Only taxable accessible before 65
+                total_assets[working_years:] = retirement_accounts[working_years:] + taxable_accounts[working_years:]
             else:
-                accessible_assets = current_assets  # All assets accessible
-            
-            data.append({
-                'age': age,
-                'year': year,
-                'total_assets': current_assets,
-                'retirement_accounts': current_retirement_accounts if self.advanced_mode else 0,
-                'taxable_accounts': current_taxable_accounts if self.advanced_mode else current_assets,
-                'accessible_assets': accessible_assets,
-                'expenses': current_expenses if age >= self.retirement_age else self.monthly_expenses * 12,
-                'social_security_benefit': total_social_security_benefit if age >= self.retirement_age else 0,
-                'coast_fire_milestone': coast_fire_milestone,
-                'achieved_coast_fire': accessible_assets >= coast_fire_milestone,
-                'achieved_fire': accessible_assets >= self.calculate_fire_number()
-            })
-            
-            age += 1
-            
-            # Stop if total assets go negative or we can't meet expenses
-            if current_assets <= 0 or (age >= self.retirement_age and accessible_assets <= 0 and not self.social_security_enabled):
-                break
+                # Simple withdrawal: A[k] = growth^(k+1) * (A_start - sum of withdrawals discounted to the start)
+                starting_assets = total_assets[working_years - 1] if working_years else self.current_assets
+                growth = (1 + self.investment_return_rate) ** np.arange(1, retired_years + 1)
+                total_assets[working_years:] = growth * (starting_assets - np.cumsum(net_expenses / growth))
+        
+        if not self.advanced_mode:
+            taxable_accounts = total_assets
+        
+        # Calculate accessible assets (for early retirement scenarios)
+        if self.advanced_mode:
+            accessible_assets = np.where(ages < 65, taxable_accounts, total_assets)
+        else:
+            accessible_assets = total_assets
+        
+        # Coast FIRE milestone for each age
+        fire_number = self.calculate_fire_number()
+        real_return_rate = self.investment_return_rate - self.inflation_rate
+        years_left_to_retirement = np.maximum(0, self.retirement_age - ages)
+        coast_fire_milestones = fire_number / ((1 + real_return_rate) ** years_left_to_retirement)
+        
+        expenses = np.full(rows, self.monthly_expenses * 12.0)
+        expenses[working_years:] = inflation_adjusted_expenses
+        social_security_benefits = np.zeros(rows)
+        social_security_benefits[working_years:] = ss_benefits
+        
+        columns = {
+            'age': ages,
+            'year': year,
+            'total_assets': total_assets,
+            'retirement_accounts': retirement_accounts,
+            'taxable_accounts': taxable_accounts,
+            'accessible_assets': accessible_assets,
+            'expenses': expenses,
+            'social_security_benefit': social_security_benefits,
+            'coast_fire_milestone': coast_fire_milestones,
+            'achieved_coast_fire': accessible_assets >= coast_fire_milestones,
+            'achieved_fire': accessible_assets >= fire_number
+        }
         
-        return pd.DataFrame(data)
+        # Stop after the first year total assets run out or expenses can no longer be met
+        stop = (total_assets <= 0) | ((ages + 1 >= self.retirement_age) & (accessible_assets <= 0) & (not self.social_security_enabled))
+        if stop.any():
+            last_row = int(np.argmax(stop))
+            columns = {name: column[:last_row + 1] for name, column in columns.items()}
+        
+        return columns
+    
+    def project_assets_over_time(self) -> pd.DataFrame:
+        """
+        Project asset growth over time with advanced mode support
+        Returns a DataFrame with year-by-year projections
+        """
+        return pd.DataFrame(self.project_assets_columns())
     
     def calculate_all(self) -> Dict[str, Any]:
         """
@@ -509,23 +1061,41 @@ class FireCalculator:
         if years_to_coast_fire != float('inf'):
             coast_fire_age = self.current_age + years_to_coast_fire
         
+        self._check_cancelled()
+        self._report_progress('projection', fire_number=fire_number, monte_carlo_stats=getattr(self, 'last_simulation_stats', None))
+        
         # Generate projection data
-        projection_df = self.project_assets_over_time()
+        projection = self.project_assets_columns()
         projection_data = {
-            'years': projection_df['year'].tolist(),
-            'ages': projection_df['age'].tolist(),
-            'total_assets': projection_df['total_assets'].tolist(),
-            'retirement_accounts': projection_df['retirement_accounts'].tolist() if self.advanced_mode else [],
-            'taxable_accounts': projection_df['taxable_accounts'].tolist(),
-            'accessible_assets': projection_df['accessible_assets'].tolist(),
-            'social_security_benefits': projection_df['social_security_benefit'].tolist() if self.social_security_enabled else [],
-            'coast_fire_milestones': projection_df['coast_fire_milestone'].tolist(),
-            'achieved_coast_fire': projection_df['achieved_coast_fire'].tolist(),
-            'achieved_fire': projection_df['achieved_fire'].tolist()
+            'years': projection['year'].tolist(),
+            'ages': projection['age'].tolist(),
+            'total_assets': projection['total_assets'].tolist(),
+            'retirement_accounts': projection['retirement_accounts'].tolist() if self.advanced_mode else [],
+            'taxable_accounts': projection['taxable_accounts'].tolist(),
+            'accessible_assets': projection['accessible_assets'].tolist(),
+            'social_security_benefits': projection['social_security_benefit'].tolist() if self.social_security_enabled else [],
+            'coast_fire_milestones': projection['coast_fire_milestone'].tolist(),
+            'achieved_coast_fire': projection['achieved_coast_fire'].tolist(),
+            'achieved_fire': projection['achieved_fire'].tolist()
         }
         
-        # Include Monte Carlo simulation statistics if available
+        # Risk band around the projected portfolio at retirement
+        pre_retirement_assets = projection['total_assets'][projection['age'] < self.retirement_age]
+        retirement_assets = pre_retirement_assets[-1] if len(pre_retirement_assets) else self.current_assets
+        self._check_cancelled()
+        percentile_trajectories = self.calculate_percentile_trajectories(retirement_assets)
+        
+        # Include Monte Carlo simulation statistics if available, with the chance
+        # that the projected portfolio lasts through retirement
         simulation_stats = getattr(self, 'last_simulation_stats', None)
+        if simulation_stats is not None:
+            success_rate, (low, high) = self.calculate_plan_success_rate(retirement_assets)
+            simulation_stats = {
+                **simulation_stats,
+                'success_rate': success_rate,
+                'confidence_interval': [low, high],
+                'interval_width': high - low
+            }
         
         return {
             'fire_number': fire_number,
@@ -534,8 +1104,88 @@ class FireCalculator:
             'years_to_coast_fire': years_to_coast_fire if years_to_coast_fire != float('inf') else None,
             'coast_fire_age': coast_fire_age,
             'projection_data': projection_data,
+            'percentile_trajectories': percentile_trajectories,
             'current_coast_fire_status': self.current_assets >= coast_fire_number,
             'current_fire_status': self.current_assets >= fire_number,
             'monthly_shortfall': max(0, (fire_number - self.current_assets) / years_to_fire / 12) if years_to_fire and years_to_fire != float('inf') else 0,
-            'monte_carlo_stats': simulation_stats
-        }
\ No newline at end of file
+            'monte_carlo_stats': simulation_stats,
+            'seed': self.seed,
+            'simulation_counters': dict(self.simulation_counters)
+        }
+
+def retirement_phase_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of calculate_all's results that ACCUMULATION_INPUTS do not affect"""
+    return {name: results[name] for name in RETIREMENT_PHASE_RESULTS}
+
+
+def run_calculation(
+    calculator_kwargs: Dict[str, Any],
+    retirement_phase: Optional[Dict[str, Any]] = None,
+    progress_queue: Optional[Any] = None,
+    cancel_token: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Build a FireCalculator and run all calculations, reusing retirement_phase if given,
+    putting progress events on progress_queue if given and raising CalculationCancelled
+    once cancel_token is set
+    Module-level so it can be sent to a worker process
+    """
+    calculator = FireCalculator(**calculator_kwargs)
+    if retirement_phase is not None:
+        calculator.reuse_retirement_phase(retirement_phase)
+    if progress_queue is not None:
+        calculator.progress_callback = progress_queue.put
+    calculator.cancel_token = cancel_token
+    return calculator.calculate_all()
+
+
+def run_calculations(
+    calculator_kwargs_list: List[Dict[str, Any]],
+    retirement_phases: Optional[List[Optional[Dict[str, Any]]]] = None,
+    cancel_token: Optional[Any] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run several scenarios in one worker call, raising CalculationCancelled once cancel_token is set
+    Scenarios with the same seed share one matrix of random draws, and scenarios that
+    differ only in ACCUMULATION_INPUTS share one FIRE number simulation
+    """
+    shared_draws: Dict[Tuple[int, str, int, int], np.ndarray] = {}
+    shared_fire_numbers: Dict[Tuple, Tuple[float, Any]] = {}
+    retirement_phases = retirement_phases or [None] * len(calculator_kwargs_list)
+    results = []
+    for calculator_kwargs, retirement_phase in zip(calculator_kwargs_list, retirement_phases):
+        calculator = FireCalculator(**calculator_kwargs)
+        calculator._standard_normals_cache = shared_draws
+        calculator._fire_number_cache = shared_fire_numbers
+        if retirement_phase is not None:
+            calculator.reuse_retirement_phase(retirement_phase)
+        calculator.cancel_token = cancel_token
+        results.append(calculator.calculate_all())
+    return results
+
+
+def run_sensitivity_grid(
+    calculator_kwargs: Dict[str, Any],
+    x_parameter: str,
+    x_values: List[float],
+    y_parameter: Optional[str] = None,
+    y_values: Optional[List[float]] = None,
+    runs: Optional[int] = None,
+    cancel_token: Optional[Any] = None
+) -> Dict[str, Any]:
+    """
+    Build a FireCalculator and sweep its inputs over a grid, raising
+    CalculationCancelled once cancel_token is set
+    Module-level so it can be sent to a worker process
+    """
+    calculator = FireCalculator(**calculator_kwargs)
+    calculator.cancel_token = cancel_token
+    return calculator.sensitivity_grid(x_parameter, x_values, y_parameter, y_values, runs)
+
+
+def run_retirement_age_curve(calculator_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build a FireCalculator and compute its retirement-age curve
+    Module-level so it can be sent to a worker process
+    """
+    return FireCalculator(**calculator_kwargs).retirement_age_curve()
@@ -0,0 +1,210 @@
+import asyncio
+import subprocess
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import CalculationJob
+
+JOB_KINDS = ('calculation', 'batch', 'sensitivity')
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+JOB_WORKER_SCRIPT = Path(__file__).with_name("job_worker.py")
+
+
+def job_priority(size: int, submitted_at: datetime) -> float:
+    """
+    The time a job should start by. Each unit of size pushes it back by
+    JOB_PRIORITY_SECONDS_PER_UNIT, so small jobs overtake large ones queued
+    shortly before them, but a large job is never overtaken forever.
+    """
+    return submitted_at.timestamp() + size * settings.JOB_PRIORITY_SECONDS_PER_UNIT
+
+
+async def submit_job(db: AsyncSession, user_id: int, kind: str, payload: Dict[str, Any], size: int) -> CalculationJob:
+    """Queue a job for the workers"""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    now = datetime.utcnow()
+    job = CalculationJob(
+        user_id=user_id,
+        kind=kind,
+        status='queued',
+        size=size,
+        priority=job_priority(size, now),
+        payload=payload,
+        attempts=0,
+        created_at=now
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+
+async def expire_leases(db: AsyncSession, now: datetime):
+    """
+    Requeue running jobs whose worker stopped renewing its lease (it crashed or
+    was killed), failing those that have used up their attempts
+    """
+    expired = (CalculationJob.status == 'running', CalculationJob.lease_expires_at < now)
+    await db.execute(
+        update(CalculationJob)
+        .where(*expired, CalculationJob.attempts >= settings.JOB_MAX_ATTEMPTS)
+        .values(
+            status='failed',
+            error=f"Worker stopped responding after {settings.JOB_MAX_ATTEMPTS} attempts",
+            worker_id=None,
+            lease_expires_at=None,
+            finished_at=now
+        )
+    )
+    await db.execute(
+        update(CalculationJob)
+        .where(*expired)
+        .values(status='queued', worker_id=None, lease_expires_at=None)
+    )
+
+
+async def claim_job(db: AsyncSession, worker_id: str) -> Optional[CalculationJob]:
+    """
+    Lease the queued job with the earliest priority to worker_id, or return None
+    if nothing is queued. The claim is a conditional UPDATE, so when workers race
+    for the same job exactly one wins and the others move on to the next.
+    """
+    now = datetime.utcnow()
+    await expire_leases(db, now)
+    await db.commit()
+    
+    while True:
+        job_id = (await db.execute(
+            select(CalculationJob.id)
+            .where(CalculationJob.status == 'queued')
+            .order_by(CalculationJob.priority, CalculationJob.id)
+            .limit(1)
+        )).scalar()
+        if job_id is None:
+            return None
+        
+        claimed = await db.execute(
+            update(CalculationJob)
+            .where(CalculationJob.id == job_id, CalculationJob.status == 'queued')
+            .values(
+                status='running',
+                worker_id=worker_id,
+                lease_expires_at=now + timedelta(seconds=settings.JOB_LEASE_SECONDS),
+                attempts=CalculationJob.attempts + 1,
+                started_at=now
+            )
+        )
+        await db.commit()
+        if claimed.rowcount:
+            return await db.get(CalculationJob, job_id)
+
+
+async def renew_lease(db: AsyncSession, job_id: int, worker_id: str) -> bool:
+    """Extend worker_id's lease on a job; False if the lease was lost to another worker"""
+    renewed = await db.execute(
+        update(CalculationJob)
+        .where(CalculationJob.id == job_id, CalculationJob.worker_id == worker_id, CalculationJob.status == 'running')
+        .values(lease_expires_at=datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS))
+    )
+    await db.commit()
+    return bool(renewed.rowcount)
+
+
+async def finish_job(
+    db: AsyncSession,
+    job_id: int,
+    worker_id: str,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[str] = None
+) -> bool:
+    """
+    Record a job's result, or its error, if worker_id still holds its lease.
+    Does not commit: the caller commits so calculations saved in the same
+    session land together with the result, or rolls back when this returns False.
+    """
+    finished = await db.execute(
+        update(CalculationJob)
+        .where(CalculationJob.id == job_id, CalculationJob.worker_id == worker_id, CalculationJob.status == 'running')
+        .values(
+            status='failed' if error is not None else 'succeeded',
+            result=result,
+            error=error,
+            lease_expires_at=None,
+            finished_at=datetime.utcnow()
+        )
+    )
+    return bool(finished.rowcount)
+
+
+async def get_job_counts(db: AsyncSession) -> Dict[str, int]:
+    """Number of jobs in each status"""
+    rows = await db.execute(select(CalculationJob.status, func.count()).group_by(CalculationJob.status))
+    counts = {job_status: 0 for job_status in JOB_STATUSES}
+    counts.update(dict(rows.all()))
+    return counts
+
+
+class JobWorkerSupervisor:
+    """
+    Runs job_worker.py processes alongside the app and restarts any that exit.
+    Workers inherit the app's environment and working directory, so they use
+    the same database.
+    """
+    
+    def __init__(self, workers: int):
+        self.workers = max(0, workers)
+        self._processes = []
+        self._monitor: Optional[asyncio.Task] = None
+        self.stats = {
+            'started': 0,
+            'restarts': 0
+        }
+    
+    def _spawn(self) -> subprocess.Popen:
+        self.stats['started'] += 1
+        return subprocess.Popen([sys.executable, str(JOB_WORKER_SCRIPT)])
+    
+    def start(self):
+        self._processes = [self._spawn() for _ in range(self.workers)]
+        if self._processes:
+            self._monitor = asyncio.create_task(self._restart_exited())
+    
+    async def _restart_exited(self):
+        while True:
+            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+            for index, process in enumerate(self._processes):
+                if process.poll() is not None:
+                    print(f"Job worker {process.pid} exited with code {process.returncode}, restarting")
+                    self.stats['restarts'] += 1
+                    self._processes[index] = self._spawn()
+    
+    async def stop(self, timeout: float = 5.0):
+        """Stop the workers. A job a worker was running is retried once its lease expires."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            try:
+                await asyncio.to_thread(process.wait, timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes = []
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'workers': self.workers,
+            'running': sum(process.poll() is None for process in self._processes)
+        }
+
+
+job_workers = JobWorkerSupervisor(settings.JOB_WORKERS)
@@ -0,0 +1,134 @@
+"""
+Background job worker.
+
+Claims queued jobs from the calculation_jobs table (job_queue), runs their
+simulations and stores the response body on the job, saving calculations the
+request asked to keep. The app starts JOB_WORKERS of these; more can be run on
+the same machine with `python job_worker.py`.
+"""
+import asyncio
+import os
+import socket
+import threading
+import traceback
+from typing import Any, Dict
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from calculation_api import (
+    calculator_kwargs, new_calculation, calculation_response, batch_response,
+    sensitivity_grid_args, sensitivity_response
+)
+from config import settings
+from database import SessionLocal, connect_database
+from fire_calculator import CalculationCancelled, run_calculation, run_calculations, run_sensitivity_grid
+from job_queue import claim_job, finish_job, renew_lease
+from models import CalculationJob
+from schemas import FireCalculationCreate, SensitivityGridRequest
+
+
+def execute_job(kind: str, payload: Dict[str, Any], cancel_token: threading.Event) -> Any:
+    """
+    Run a job's simulations; called in a thread so the worker can keep renewing its
+    lease, and stopped with CalculationCancelled once cancel_token is set
+    """
+    if kind == 'calculation':
+        return run_calculation(calculator_kwargs(FireCalculationCreate(**payload['calculation'])), cancel_token=cancel_token)
+    if kind == 'batch':
+        scenarios = [FireCalculationCreate(**scenario) for scenario in payload['scenarios']]
+        return run_calculations([calculator_kwargs(scenario) for scenario in scenarios], cancel_token=cancel_token)
+    if kind == 'sensitivity':
+        grid_args = sensitivity_grid_args(SensitivityGridRequest(**payload['grid']))
+        return run_sensitivity_grid(*grid_args, cancel_token=cancel_token)
+    raise ValueError(f"Unknown job kind: {kind}")
+
+
+async def record_results(db: AsyncSession, job: CalculationJob, results: Any) -> Dict[str, Any]:
+    """Add any calculations the job saves to the session and return its response body"""
+    payload = job.payload
+    if job.kind == 'calculation':
+        calculation = FireCalculationCreate(**payload['calculation'])
+        db_calculation = new_calculation(job.user_id, calculation, results)
+        db.add(db_calculation)
+        await db.flush()
+        # Stored compact; the result endpoint decodes it on request
+        return jsonable_encoder(calculation_response(calculation, db_calculation, results, "compact"))
+    
+    if job.kind == 'batch':
+        scenarios = [FireCalculationCreate(**scenario) for scenario in payload['scenarios']]
+        db_calculations = [None] * len(scenarios)
+        if payload['save']:
+            db_calculations = [
+                new_calculation(job.user_id, scenario, scenario_results)
+                for scenario, scenario_results in zip(scenarios, results)
+            ]
+            db.add_all(db_calculations)
+            await db.flush()
+        return jsonable_encoder(batch_response(
+            payload['seed'], scenarios, results, db_calculations, payload['include_projection']
+        ))
+    
+    return jsonable_encoder(sensitivity_response(SensitivityGridRequest(**payload['grid']), results))
+
+
+def job_error(error: Exception) -> str:
+    if isinstance(error, HTTPException):
+        return str(error.detail)
+    return f"{type(error).__name__}: {error}"
+
+
+async def process_job(job: CalculationJob, worker_id: str):
+    """
+    Run a claimed job, renewing its lease every heartbeat until it finishes. If the
+    lease is lost, another worker has taken the job over, so this one stops it.
+    """
+    cancel_token = threading.Event()
+    work = asyncio.get_running_loop().run_in_executor(None, execute_job, job.kind, job.payload, cancel_token)
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=settings.JOB_HEARTBEAT_SECONDS)
+        if done:
+            break
+        async with SessionLocal() as db:
+            renewed = await renew_lease(db, job.id, worker_id)
+        if not renewed:
+            print(f"Job {job.id}: lease lost, stopping")
+            cancel_token.set()
+            try:
+                await work
+            except CalculationCancelled:
+                pass
+            return
+    
+    async with SessionLocal() as db:
+        try:
+            result, error = await record_results(db, job, work.result()), None
+        except Exception as e:
+            traceback.print_exc()
+            await db.rollback()
+            result, error = None, job_error(e)
+        
+        if await finish_job(db, job.id, worker_id, result, error):
+            await db.commit()
+        else:
+            await db.rollback()
+
+
+async def work(worker_id: str):
+    await connect_database()
+    print(f"Job worker {worker_id} started")
+    while True:
+        async with SessionLocal() as db:
+            job = await claim_job(db, worker_id)
+        if job is None:
+            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+            continue
+        await process_job(job, worker_id)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(work(f"{socket.gethostname()}:{os.getpid()}"))
+    except KeyboardInterrupt:
+        pass
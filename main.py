@@ -1,31 +1,66 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from contextlib import asynccontextmanager
 import uvicorn
 import os
+import random
+import functools
+import math
+import asyncio
+import json
+import base64
+import queue
 from pathlib import Path
+from datetime import datetime
+from typing import Optional, Union
 
-from database import engine, get_db
-from auth import create_access_token, verify_token, get_password_hash, verify_password
-from models import User, FireCalculation, Base
-from schemas import UserCreate, UserLogin, FireCalculationCreate, FireCalculationResponse
-from fire_calculator import FireCalculator
+from database import get_db, init_database, close_database
+from auth import create_access_token, verify_token, hash_password, verify_and_update_password, password_hash_latency
+from models import User, FireCalculation, CalculationJob, Base
+from schemas import (
+    UserCreate, UserLogin, FireCalculationCreate, FireCalculationResponse,
+    FireCalculationSummary, FireCalculationPage,
+    FireCalculationBatchCreate, FireCalculationBatchResponse,
+    FireCalculationPreviewResponse,
+    SensitivityGridRequest, SensitivityGridResponse, RetirementCurveResponse,
+    CalculationJobResponse
+)
+from fire_calculator import (
+    run_calculation, run_calculations, run_sensitivity_grid, run_retirement_age_curve,
+    retirement_phase_results, MAX_SEED
+)
+from calculation_api import (
+    calculator_kwargs, check_projection_format, projection_payload, new_calculation,
+    calculation_response, batch_scenarios, batch_response, sensitivity_grid_args, sensitivity_response
+)
+from calculation_pool import calculation_pool, PoolSaturatedError, BrokenProcessPool
+from result_cache import result_cache, calculation_cache_key
+from single_flight import calculation_flights
+from rate_limit import preview_rate_limiter
+from user_cache import authenticated_user_cache
+from cancellation import calculation_sessions, client_session
+from job_queue import job_workers, submit_job, get_job_counts
 from config import settings
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: create database tables
+    await init_database(Base.metadata)
+    calculation_pool.start()
+    job_workers.start()
     yield
     # Shutdown
-    pass
+    calculation_pool.shutdown()
+    await job_workers.stop()
+    await close_database()
 
 app = FastAPI(
     title="FIRE Calculator",
@@ -51,8 +86,13 @@ templates = Jinja2Templates(directory="templates")
 security = HTTPBearer()
 
 # Dependency to get current user
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_db)):
     token = credentials.credentials
+    # Recently verified tokens skip JWT decoding and the user lookup
+    user = authenticated_user_cache.get(token)
+    if user is not None:
+        return user
+    
     payload = verify_token(token)
     if payload is None:
         raise HTTPException(
@@ -62,14 +102,23 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         )
     
     user_id = payload.get("sub")
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
+    authenticated_user_cache.set(token, user, payload.get("exp"))
     return user
 
+async def get_admin_user(current_user: User = Depends(get_current_user)):
+    if current_user.email.lower() not in settings.ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required"
+        )
+    return current_user
+
 # Routes
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -88,9 +137,9 @@ async def register_page(request: Request):
     return templates.TemplateResponse("register.html", {"request": request})
 
 @app.post("/api/register")
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = (await db.execute(select(User).filter(User.email == user.email))).scalars().first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -98,15 +147,14 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password(user.password)
     db_user = User(
         email=user.email,
         username=user.username,
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
     
     # Create access token
     access_token = create_access_token(data={"sub": str(db_user.id)})
@@ -119,17 +167,26 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     }
 
 @app.post("/api/login")
-async def login(user: UserLogin, db: Session = Depends(get_db)):
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
     # Verify user credentials - check both email and username
-    db_user = db.query(User).filter(
+    db_user = (await db.execute(select(User).filter(
         (User.email == user.email) | (User.username == user.email)
-    ).first()
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+    ))).scalars().first()
+    verified, new_hash = False, None
+    if db_user:
+        verified, new_hash = await verify_and_update_password(user.password, db_user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email/username or password"
         )
     
+    # Rehash passwords stored with a different bcrypt cost
+    if new_hash:
+        db_user.hashed_password = new_hash
+        await db.commit()
+        authenticated_user_cache.invalidate_user(db_user.id)
+    
     # Create access token
     access_token = create_access_token(data={"sub": str(db_user.id)})
     
@@ -140,145 +197,487 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         "username": db_user.username
     }
 
+async def run_in_pool(fn, *args):
+    """Run a calculation in the worker pool, answering 503 when the pool is saturated"""
+    try:
+        return await calculation_pool.run(fn, *args)
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Calculation service is busy, please retry shortly",
+            headers={"Retry-After": str(settings.CALCULATION_RETRY_AFTER_SECONDS)}
+        )
+    except BrokenProcessPool:
+        # The pool has been replaced, so a retry runs on fresh workers
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="A calculation worker stopped unexpectedly, please retry",
+            headers={"Retry-After": str(settings.CALCULATION_RETRY_AFTER_SECONDS)}
+        )
+
+async def run_calculation_reusing_retirement_phase(kwargs: dict, progress_queue=None) -> dict:
+    """
+    Run a full calculation in the pool. When an earlier calculation differed only in
+    accumulation inputs (savings, balances, 401K), its FIRE number simulation is reused
+    and only the accumulation projection is recomputed.
+    """
+    phase_key = calculation_cache_key(kwargs, 'retirement_phase')
+    retirement_phase = await result_cache.get(phase_key)
+    cancel_token = await calculation_pool.cancel_token()
+    try:
+        results = await run_in_pool(run_calculation, kwargs, retirement_phase, progress_queue, cancel_token)
+    except asyncio.CancelledError:
+        # Tell the worker to stop at its next simulation batch
+        cancel_token.set()
+        raise
+    if retirement_phase is None and results['monte_carlo_stats'] is not None:
+        await result_cache.set(phase_key, retirement_phase_results(results))
+    return results
+
+async def compute_results(kwargs: dict, calculate=run_calculation_reusing_retirement_phase, kind: str = 'calculation') -> dict:
+    """
+    Return cached results for these inputs, awaiting calculate(kwargs) on a miss.
+    Concurrent requests with identical inputs share a single calculation.
+    """
+    key = calculation_cache_key(kwargs, kind)
+    results = await result_cache.get(key)
+    if results is None:
+        async def calculate_and_cache():
+            calculated = await calculate(kwargs)
+            await result_cache.set(key, calculated)
+            return calculated
+        
+        results = await calculation_flights.do(key, calculate_and_cache)
+    return results
+
+async def save_calculation(db: AsyncSession, user_id: int, calculation: FireCalculationCreate, results: dict) -> FireCalculation:
+    db_calculation = new_calculation(user_id, calculation, results)
+    db.add(db_calculation)
+    await db.commit()
+    return db_calculation
+
+def user_session(request: Request, user: User) -> str:
+    """A signed-in user's tab, or the user as a whole when the client sends no session id"""
+    scope = f"calculate:user:{user.id}"
+    return client_session(request, scope, default=scope)
+
 @app.post("/api/calculate", response_model=FireCalculationResponse)
 async def calculate_fire(
     calculation: FireCalculationCreate,
+    request: Request,
+    projection_format: str = "json",
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Perform FIRE calculations
-    calculator = FireCalculator(
-        current_age=calculation.current_age,
-        retirement_age=calculation.retirement_age,
-        current_assets=calculation.current_assets,
-        monthly_income=calculation.monthly_income,
-        monthly_expenses=calculation.monthly_expenses,
-        monthly_savings=calculation.monthly_savings,
-        retirement_expenses=calculation.retirement_expenses,
-        investment_return_rate=calculation.investment_return_rate / 100,
-        inflation_rate=calculation.inflation_rate / 100,
-        safe_withdrawal_rate=calculation.safe_withdrawal_rate / 100,
-        # Advanced mode parameters
-        advanced_mode=calculation.advanced_mode,
-        retirement_accounts=calculation.retirement_accounts or 0,
-        taxable_accounts=calculation.taxable_accounts or 0,
-        retirement_account_return_rate=(calculation.retirement_account_return_rate or 7.0) / 100,
-        # Social Security parameters
-        social_security_enabled=calculation.social_security_enabled,
-        social_security_start_age=calculation.social_security_start_age or 65,
-        social_security_monthly_benefit=calculation.social_security_monthly_benefit or 0,
-        # Spouse parameters
-        spouse_enabled=calculation.spouse_enabled,
-        spouse_age=calculation.spouse_age or 30,
-        spouse_social_security_enabled=calculation.spouse_social_security_enabled,
-        spouse_social_security_start_age=calculation.spouse_social_security_start_age or 65,
-        spouse_social_security_monthly_benefit=calculation.spouse_social_security_monthly_benefit or 0,
-        # 401K contribution parameters
-        contribution_401k_percentage=calculation.contribution_401k_percentage,
-        employer_match_percentage=calculation.employer_match_percentage
+    check_projection_format(projection_format)
+    
+    # Perform FIRE calculations off the event loop; a request with other inputs from the same tab cancels this one
+    kwargs = calculator_kwargs(calculation)
+    results = await calculation_sessions.run(
+        user_session(request, current_user),
+        calculation_cache_key(kwargs),
+        request,
+        compute_results(kwargs)
     )
     
-    results = calculator.calculate_all()
+    db_calculation = await save_calculation(db, current_user.id, calculation, results)
+    return calculation_response(calculation, db_calculation, results, projection_format)
+
+def sse_event(event: str, data) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+@app.post("/api/calculate/stream")
+async def calculate_fire_stream(
+    calculation: FireCalculationCreate,
+    request: Request,
+    projection_format: str = "json",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Same as /api/calculate, streamed as Server-Sent Events: "progress" events after
+    each simulation batch (provisional FIRE number and its interval), then a
+    "result" event with the saved calculation, or an "error" event
+    """
+    check_projection_format(projection_format)
+    if calculation_pool.saturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Calculation service is busy, please retry shortly",
+            headers={"Retry-After": str(settings.CALCULATION_RETRY_AFTER_SECONDS)}
+        )
+    
+    kwargs = calculator_kwargs(calculation)
+    key = calculation_cache_key(kwargs)
+    session = user_session(request, current_user)
     
-    # Save calculation to database
-    db_calculation = FireCalculation(
-        user_id=current_user.id,
-        **calculation.dict(),
+    async def events():
+        results = await result_cache.get(key)
+        if results is None:
+            progress = await calculation_pool.progress_queue()
+            task = asyncio.ensure_future(run_calculation_reusing_retirement_phase(kwargs, progress))
+            calculation_sessions.start(session, key, task)
+            try:
+                while True:
+                    await asyncio.wait({task}, timeout=settings.PROGRESS_POLL_SECONDS)
+                    while True:
+                        try:
+                            event = progress.get_nowait()
+                        except queue.Empty:
+                            break
+                        yield sse_event("progress", event)
+                    if task.done():
+                        break
+            finally:
+                # The response is closed when the client disconnects; stop the worker too
+                if not task.done():
+                    task.cancel()
+                    calculation_sessions.stats['disconnected'] += 1
+                calculation_sessions.finish(session, task)
+            
+            if task.cancelled():
+                yield sse_event("error", {"status_code": 409, "detail": "Superseded by a newer calculation"})
+                return
+            try:
+                results = task.result()
+            except HTTPException as e:
+                yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+                return
+            await result_cache.set(key, results)
+        
+        db_calculation = await save_calculation(db, current_user.id, calculation, results)
+        yield sse_event("result", calculation_response(calculation, db_calculation, results, projection_format))
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.post("/api/calculate/preview", response_model=FireCalculationPreviewResponse)
+async def preview_fire(calculation: FireCalculationCreate, request: Request, projection_format: str = "json"):
+    # Unauthenticated and unsaved, so guests see the same engine as signed-in users
+    check_projection_format(projection_format)
+    client = request.client.host if request.client else "unknown"
+    retry_after = preview_rate_limiter.acquire(client)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many preview calculations, please slow down",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+    
+    # Guests share IPs, so only previews that send a session id can be superseded
+    kwargs = calculator_kwargs(calculation)
+    results = await calculation_sessions.run(
+        client_session(request, "preview"), calculation_cache_key(kwargs), request, compute_results(kwargs)
+    )
+    return FireCalculationPreviewResponse(
         fire_number=results['fire_number'],
         coast_fire_number=results['coast_fire_number'],
         years_to_fire=results['years_to_fire'],
         years_to_coast_fire=results['years_to_coast_fire'],
         coast_fire_age=results['coast_fire_age'],
-        projection_data=results['projection_data']
+        current_fire_status=results['current_fire_status'],
+        current_coast_fire_status=results['current_coast_fire_status'],
+        monthly_shortfall=results['monthly_shortfall'],
+        projection_data=projection_payload(results['projection_data'], projection_format),
+        percentile_trajectories=results['percentile_trajectories'],
+        seed=results['seed'],
+        monte_carlo_stats=results['monte_carlo_stats']
     )
-    db.add(db_calculation)
-    db.commit()
-    db.refresh(db_calculation)
+
+@app.post("/api/calculate/batch", response_model=FireCalculationBatchResponse)
+async def calculate_fire_batch(
+    batch: FireCalculationBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    batch_seed, scenarios = batch_scenarios(batch)
     
-    return FireCalculationResponse(
-        id=db_calculation.id,
-        **calculation.dict(),
-        fire_number=results['fire_number'],
-        coast_fire_number=results['coast_fire_number'],
-        years_to_fire=results['years_to_fire'],
-        years_to_coast_fire=results['years_to_coast_fire'],
-        coast_fire_age=results['coast_fire_age'],
-        projection_data=results['projection_data'],
-        created_at=db_calculation.created_at
+    # Serve what we can from the result cache and evaluate the rest in one worker call
+    all_kwargs = [calculator_kwargs(scenario) for scenario in scenarios]
+    keys = [calculation_cache_key(kwargs) for kwargs in all_kwargs]
+    results = [await result_cache.get(key) for key in keys]
+    missing = [index for index, cached in enumerate(results) if cached is None]
+    if missing:
+        phase_keys = [calculation_cache_key(all_kwargs[index], 'retirement_phase') for index in missing]
+        retirement_phases = [await result_cache.get(phase_key) for phase_key in phase_keys]
+        calculated = await run_in_pool(run_calculations, [all_kwargs[index] for index in missing], retirement_phases)
+        for index, phase_key, retirement_phase, scenario_results in zip(missing, phase_keys, retirement_phases, calculated):
+            await result_cache.set(keys[index], scenario_results)
+            if retirement_phase is None and scenario_results['monte_carlo_stats'] is not None:
+                await result_cache.set(phase_key, retirement_phase_results(scenario_results))
+            results[index] = scenario_results
+    
+    # Saved scenarios are written in one transaction
+    db_calculations = [None] * len(scenarios)
+    if batch.save:
+        db_calculations = [
+            new_calculation(current_user.id, scenario, scenario_results)
+            for scenario, scenario_results in zip(scenarios, results)
+        ]
+        db.add_all(db_calculations)
+        await db.commit()
+    
+    return batch_response(batch_seed, scenarios, results, db_calculations, batch.include_projection)
+
+@app.post("/api/calculate/sensitivity", response_model=SensitivityGridResponse)
+async def calculate_sensitivity_grid(
+    grid: SensitivityGridRequest,
+    current_user: User = Depends(get_current_user)
+):
+    results = await run_in_pool(run_sensitivity_grid, *sensitivity_grid_args(grid))
+    return sensitivity_response(grid, results)
+
+@app.post("/api/calculate/retirement-curve", response_model=RetirementCurveResponse)
+async def calculate_retirement_curve(
+    calculation: FireCalculationCreate,
+    current_user: User = Depends(get_current_user)
+):
+    # One response covers every retirement age, so the slider can be scrubbed client-side
+    kwargs = calculator_kwargs(calculation)
+    if kwargs['seed'] is None:
+        # Draw the same paths as an earlier calculation of these inputs, so the curve matches it
+        retirement_phase = await result_cache.get(calculation_cache_key(kwargs, 'retirement_phase'))
+        if retirement_phase is not None:
+            kwargs['seed'] = retirement_phase['monte_carlo_stats']['seed']
+    results = await compute_results(
+        kwargs,
+        functools.partial(run_in_pool, run_retirement_age_curve),
+        kind='retirement_curve'
     )
+    return RetirementCurveResponse(**results)
+
+CALCULATION_VIEWS = ("summary", "full")
+
+def encode_cursor(calculation: FireCalculation) -> str:
+    """Opaque keyset cursor: the (created_at, id) position of the last row on a page"""
+    position = json.dumps({"created_at": calculation.created_at.isoformat(), "id": calculation.id})
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(position["created_at"]), int(position["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
 
-@app.get("/api/calculations")
+def user_calculations_query(user_id: int, view: str):
+    """A user's calculations, newest first; the summary view does not load projection_data"""
+    if view not in CALCULATION_VIEWS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"view must be one of {', '.join(CALCULATION_VIEWS)}"
+        )
+    query = select(FireCalculation).filter(FireCalculation.user_id == user_id)
+    if view == "summary":
+        query = query.options(defer(FireCalculation.projection_data))
+    return query.order_by(FireCalculation.created_at.desc(), FireCalculation.id.desc())
+
+def calculation_view(calculation: FireCalculation, view: str, projection_format: str = "json"):
+    if view == "summary":
+        return FireCalculationSummary.from_orm(calculation)
+    # Stored projection data is only decoded when the client asks for JSON lists
+    response = FireCalculationResponse.from_orm(calculation)
+    response.projection_data = projection_payload(calculation.projection_data, projection_format)
+    return response
+
+@app.get("/api/calculations", response_model=FireCalculationPage)
 async def get_user_calculations(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: str = "summary",
+    projection_format: str = "json",
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    calculations = db.query(FireCalculation).filter(
+    query = user_calculations_query(current_user.id, view)
+    if cursor:
+        created_at, calculation_id = decode_cursor(cursor)
+        # A row-value comparison lets the (user_id, created_at, id) index seek straight to the cursor
+        query = query.filter(tuple_(FireCalculation.created_at, FireCalculation.id) < tuple_(created_at, calculation_id))
+    
+    # Fetch one extra row to learn whether another page follows
+    calculations = (await db.execute(query.limit(limit + 1))).scalars().all()
+    next_cursor = encode_cursor(calculations[limit - 1]) if len(calculations) > limit else None
+    
+    return FireCalculationPage(
+        items=[calculation_view(calc, view, projection_format) for calc in calculations[:limit]],
+        next_cursor=next_cursor
+    )
+
+@app.get("/api/calculations/latest", response_model=Union[FireCalculationResponse, FireCalculationSummary])
+async def get_latest_calculation(
+    view: str = "summary",
+    projection_format: str = "json",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    calculation = (await db.execute(user_calculations_query(current_user.id, view).limit(1))).scalars().first()
+    if not calculation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No saved calculations"
+        )
+    return calculation_view(calculation, view, projection_format)
+
+@app.get("/api/calculations/{calculation_id}", response_model=FireCalculationResponse)
+async def get_calculation(
+    calculation_id: int,
+    projection_format: str = "json",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    calculation = (await db.execute(select(FireCalculation).filter(
+        FireCalculation.id == calculation_id,
         FireCalculation.user_id == current_user.id
-    ).order_by(FireCalculation.created_at.desc()).all()
+    ))).scalars().first()
     
-    return [
-        FireCalculationResponse(
-            id=calc.id,
-            current_age=calc.current_age,
-            retirement_age=calc.retirement_age,
-            current_assets=calc.current_assets,
-            monthly_income=calc.monthly_income,
-            monthly_expenses=calc.monthly_expenses,
-            monthly_savings=calc.monthly_savings,
-            retirement_expenses=calc.retirement_expenses,
-            investment_return_rate=calc.investment_return_rate,
-            inflation_rate=calc.inflation_rate,
-            safe_withdrawal_rate=calc.safe_withdrawal_rate,
-            # Advanced mode parameters
-            advanced_mode=calc.advanced_mode,
-            retirement_accounts=calc.retirement_accounts,
-            taxable_accounts=calc.taxable_accounts,
-            retirement_account_return_rate=calc.retirement_account_return_rate,
-            # Social Security parameters
-            social_security_enabled=calc.social_security_enabled,
-            social_security_start_age=calc.social_security_start_age,
-            social_security_monthly_benefit=calc.social_security_monthly_benefit,
-            # Spouse parameters
-            spouse_enabled=calc.spouse_enabled,
-            spouse_age=calc.spouse_age,
-            spouse_social_security_enabled=calc.spouse_social_security_enabled,
-            spouse_social_security_start_age=calc.spouse_social_security_start_age,
-            spouse_social_security_monthly_benefit=calc.spouse_social_security_monthly_benefit,
-            # 401K parameters
-            contribution_401k_percentage=calc.contribution_401k_percentage,
-            employer_match_percentage=calc.employer_match_percentage,
-            # Results
-            fire_number=calc.fire_number,
-            coast_fire_number=calc.coast_fire_number,
-            years_to_fire=calc.years_to_fire,
-            years_to_coast_fire=calc.years_to_coast_fire,
-            coast_fire_age=calc.coast_fire_age,
-            projection_data=calc.projection_data,
-            created_at=calc.created_at
-        ) for calc in calculations
-    ]
+    if not calculation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Calculation not found"
+        )
+    return calculation_view(calculation, "full", projection_format)
 
 @app.delete("/api/calculations/{calculation_id}")
 async def delete_calculation(
     calculation_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    calculation = db.query(FireCalculation).filter(
+    # One DELETE statement; no need to load the row first
+    deleted = await db.execute(delete(FireCalculation).filter(
         FireCalculation.id == calculation_id,
         FireCalculation.user_id == current_user.id
-    ).first()
+    ))
     
-    if not calculation:
+    if not deleted.rowcount:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Calculation not found"
         )
-    
-    db.delete(calculation)
-    db.commit()
+    await db.commit()
     
     return {"message": "Calculation deleted successfully"}
 
+# Background jobs: submit now, poll /api/jobs/{id}, then fetch /api/jobs/{id}/result
+@app.post("/api/jobs/calculate", response_model=CalculationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_calculation_job(
+    calculation: FireCalculationCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # The seed is fixed now so a retried job reproduces the same result
+    if calculation.seed is None:
+        calculation = calculation.copy(update={'seed': random.randint(0, MAX_SEED)})
+    job = await submit_job(db, current_user.id, 'calculation', {'calculation': calculation.dict()}, size=1)
+    return CalculationJobResponse.from_orm(job)
+
+@app.post("/api/jobs/batch", response_model=CalculationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_batch_job(
+    batch: FireCalculationBatchCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Seeds are fixed now so a retried job reproduces the same results
+    batch_seed, scenarios = batch_scenarios(batch)
+    payload = {
+        'seed': batch_seed,
+        'scenarios': [scenario.dict() for scenario in scenarios],
+        'save': batch.save,
+        'include_projection': batch.include_projection
+    }
+    job = await submit_job(db, current_user.id, 'batch', payload, size=len(scenarios))
+    return CalculationJobResponse.from_orm(job)
+
+@app.post("/api/jobs/sensitivity", response_model=CalculationJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_sensitivity_job(
+    grid: SensitivityGridRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Reject invalid grids now rather than in the worker
+    sensitivity_grid_args(grid)
+    cells = len(grid.x_values) * (len(grid.y_values) if grid.y_parameter else 1)
+    if grid.base.seed is None:
+        grid = grid.copy(update={'base': grid.base.copy(update={'seed': random.randint(0, MAX_SEED)})})
+    job = await submit_job(db, current_user.id, 'sensitivity', {'grid': grid.dict()}, size=cells)
+    return CalculationJobResponse.from_orm(job)
+
+async def get_user_job(db: AsyncSession, job_id: int, user_id: int, *options) -> CalculationJob:
+    job = (await db.execute(select(CalculationJob).options(*options).filter(
+        CalculationJob.id == job_id,
+        CalculationJob.user_id == user_id
+    ))).scalars().first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@app.get("/api/jobs/{job_id}", response_model=CalculationJobResponse)
+async def get_job(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    job = await get_user_job(db, job_id, current_user.id, defer(CalculationJob.payload), defer(CalculationJob.result))
+    return CalculationJobResponse.from_orm(job)
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(
+    job_id: int,
+    projection_format: str = "json",
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """The finished job's response: a calculation, batch or sensitivity grid as the matching endpoint returns it"""
+    check_projection_format(projection_format)
+    job = await get_user_job(db, job_id, current_user.id, defer(CalculationJob.payload))
+    if job.status == 'failed':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job failed: {job.error}"
+        )
+    if job.status != 'succeeded':
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job.status}"
+        )
+    
+    result = job.result
+    if job.kind == 'calculation':
+        result = {**result, 'projection_data': projection_payload(result['projection_data'], projection_format)}
+    return result
+
+@app.get("/api/stats")
+async def get_stats(
+    admin: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return {
+        "result_cache": result_cache.get_stats(),
+        "single_flight": calculation_flights.get_stats(),
+        "preview_rate_limit": preview_rate_limiter.get_stats(),
+        "calculation_sessions": calculation_sessions.get_stats(),
+        "password_hash_latency": password_hash_latency.get_stats(),
+        "authenticated_user_cache": authenticated_user_cache.get_stats(),
+        "jobs": {
+            **job_workers.get_stats(),
+            "counts": await get_job_counts(db)
+        },
+        "calculation_pool": {
+            "executor": calculation_pool.executor_type,
+            "workers": calculation_pool.max_workers,
+            "in_flight": calculation_pool.in_flight,
+            "queue_limit": calculation_pool.queue_limit,
+            "broken_pools": calculation_pool.broken_pools
+        }
+    }
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=True)
\ No newline at end of file
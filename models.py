@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -16,9 +16,14 @@ class User(Base):
     
     # Relationship to calculations
     calculations = relationship("FireCalculation", back_populates="user")
+    jobs = relationship("CalculationJob", back_populates="user")
 
 class FireCalculation(Base):
     __tablename__ = "fire_calculations"
+    __table_args__ = (
+        # History queries filter by user and page newest first, with id breaking ties
+        Index("ix_fire_calculations_user_id_created_at", "user_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -64,8 +69,43 @@ class FireCalculation(Base):
     years_to_coast_fire = Column(Float, nullable=True)
     coast_fire_age = Column(Float, nullable=True)
     projection_data = Column(JSON, nullable=True)
+    seed = Column(Integer, nullable=True)  # Monte Carlo seed, for replaying the calculation
     
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Relationship to user
-    user = relationship("User", back_populates="calculations")
\ No newline at end of file
+    user = relationship("User", back_populates="calculations")
+
+class CalculationJob(Base):
+    """A queued background calculation; see job_queue for its lifecycle"""
+    __tablename__ = "calculation_jobs"
+    __table_args__ = (
+        # Workers claim the queued job with the lowest priority value first
+        Index("ix_calculation_jobs_status_priority", "status", "priority"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    
+    # Scheduling: size in scenarios or grid cells, and the time the job should start by
+    size = Column(Integer, nullable=False)
+    priority = Column(Float, nullable=False)
+    
+    # Request inputs and, once finished, the response body or error
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON)
+    error = Column(String)
+    
+    # Lease held by the worker running the job; an expired lease means the worker died
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String)
+    lease_expires_at = Column(DateTime)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    # Relationship to user
+    user = relationship("User", back_populates="jobs")
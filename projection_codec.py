@@ -0,0 +1,91 @@
+"""
+Compact encoding for saved projection data.
+
+Projection data is a set of parallel per-year columns. Stored as JSON lists, every
+float costs ~18 characters. The compact form keeps the same columns but stores
+year and age counters as ranges, numbers as deflated little-endian float32,
+flags as bit-packed booleans and repeated columns as references, with binary
+data in base64 and the whole tagged with PROJECTION_FORMAT. Columns are
+decoded only when a client asks for the plain JSON form; rows saved before the
+encoding existed (plain dicts of lists) pass through unchanged.
+"""
+import base64
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Bump when the layout changes; decode_projection must keep reading older tags
+PROJECTION_FORMAT = "columnar-f32-v1"
+
+FLOAT32 = np.dtype('<f4')
+
+
+def is_encoded(projection_data: Optional[Dict[str, Any]]) -> bool:
+    return isinstance(projection_data, dict) and projection_data.get('format') == PROJECTION_FORMAT
+
+
+def _encode_column(values: List[Any]) -> Dict[str, Any]:
+    if not values:
+        return {'type': 'empty'}
+    if all(isinstance(value, bool) for value in values):
+        bits = np.packbits(np.asarray(values, dtype=bool))
+        return {'type': 'bits', 'data': base64.b64encode(bits.tobytes()).decode('ascii')}
+    if all(isinstance(value, int) for value in values) and values == list(range(values[0], values[0] + len(values))):
+        return {'type': 'range', 'start': values[0]}
+    # Grouping each float's bytes by significance before deflating lets slowly
+    # changing series (and runs of zeros) compress well
+    floats = np.asarray(values, dtype=FLOAT32)
+    shuffled = floats.view(np.uint8).reshape(-1, FLOAT32.itemsize).T.tobytes()
+    return {'type': 'float32', 'data': base64.b64encode(zlib.compress(shuffled, 9)).decode('ascii')}
+
+
+def _decode_column(column: Dict[str, Any], rows: int) -> List[Any]:
+    column_type = column['type']
+    if column_type == 'empty':
+        return []
+    if column_type == 'range':
+        return list(range(column['start'], column['start'] + rows))
+    data = base64.b64decode(column['data'])
+    if column_type == 'bits':
+        return np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=rows).astype(bool).tolist()
+    if column_type == 'float32':
+        shuffled = np.frombuffer(zlib.decompress(data), dtype=np.uint8)
+        return shuffled.reshape(FLOAT32.itemsize, -1).T.copy().view(FLOAT32).ravel().astype(float).tolist()
+    raise ValueError(f"Unknown projection column type: {column_type}")
+
+
+def encode_projection(projection_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Compact form of projection data; already-encoded data is returned as is"""
+    if projection_data is None or is_encoded(projection_data):
+        return projection_data
+    rows = max((len(values) for values in projection_data.values()), default=0)
+    
+    columns = {}
+    for name, values in projection_data.items():
+        # Basic mode repeats the same series under several names
+        duplicate_of = next((
+            other for other in columns
+            if values and projection_data[other] == values and type(projection_data[other][0]) is type(values[0])
+        ), None)
+        columns[name] = {'type': 'same', 'as': duplicate_of} if duplicate_of else _encode_column(values)
+    
+    return {
+        'format': PROJECTION_FORMAT,
+        'rows': rows,
+        'columns': columns
+    }
+
+
+def decode_projection(projection_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Plain JSON lists from either form of projection data"""
+    if not is_encoded(projection_data):
+        return projection_data
+    rows = projection_data['rows']
+    decoded = {}
+    for name, column in projection_data['columns'].items():
+        if column['type'] == 'same':
+            decoded[name] = list(decoded[column['as']])
+        else:
+            decoded[name] = _decode_column(column, rows)
+    return decoded
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict
+
+from config import settings
+
+
+class TokenBucketLimiter:
+    """
+    Per-client token buckets. Each key may spend up to `burst` requests at once
+    and regains `rate_per_minute` tokens per minute. Only the most recently seen
+    `max_keys` clients are tracked; a forgotten client starts with a full bucket.
+    """
+    
+    def __init__(self, rate_per_minute: float, burst: int, max_keys: int = 10000):
+        # At least one token an hour, so every client eventually gets through
+        self.rate_per_second = max(rate_per_minute, 1 / 60) / 60
+        self.burst = max(1, burst)
+        self.max_keys = max(1, max_keys)
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'allowed': 0,
+            'limited': 0
+        }
+    
+    def acquire(self, key: str) -> float:
+        """
+        Take a token for key. Returns 0 when the request may proceed, otherwise
+        the number of seconds until a token will be available.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate_per_second)
+        
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+                self.stats['allowed'] += 1
+            else:
+                retry_after = (1 - tokens) / self.rate_per_second
+                self.stats['limited'] += 1
+        
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tracked = len(self._buckets)
+        return {
+            **self.stats,
+            'tracked_clients': tracked,
+            'rate_per_minute': self.rate_per_second * 60,
+            'burst': self.burst
+        }
+
+
+preview_rate_limiter = TokenBucketLimiter(
+    settings.PREVIEW_RATE_LIMIT_PER_MINUTE,
+    settings.PREVIEW_RATE_LIMIT_BURST
+)
@@ -0,0 +1,202 @@
+import asyncio
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from config import settings
+from fire_calculator import ACCUMULATION_INPUTS, ENGINE_VERSION
+
+# Inputs that only matter when the feature that reads them is switched on
+ADVANCED_MODE_INPUTS = ('retirement_accounts', 'taxable_accounts', 'retirement_account_return_rate')
+SOCIAL_SECURITY_INPUTS = ('social_security_start_age', 'social_security_monthly_benefit')
+SPOUSE_SOCIAL_SECURITY_INPUTS = ('spouse_age', 'spouse_social_security_start_age', 'spouse_social_security_monthly_benefit')
+
+# Inputs a kind of result does not depend on; the retirement-age curve covers every age
+IGNORED_INPUTS_BY_KIND = {
+    'retirement_curve': ('retirement_age', 'safe_withdrawal_rate'),
+    'retirement_phase': ACCUMULATION_INPUTS
+}
+
+
+def normalize_calculator_inputs(calculator_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonical form of FireCalculator keyword arguments.
+    Numbers become rounded floats and inputs ignored by the calculation are dropped,
+    so payloads that can only produce the same result normalize identically.
+    """
+    normalized = {}
+    for name, value in calculator_kwargs.items():
+        if isinstance(value, bool) or value is None:
+            normalized[name] = value
+        elif isinstance(value, (int, float)):
+            normalized[name] = round(float(value), 9)
+        else:
+            normalized[name] = value
+    
+    if normalized.get('advanced_mode'):
+        normalized.pop('current_assets', None)
+    else:
+        for name in ADVANCED_MODE_INPUTS:
+            normalized.pop(name, None)
+    
+    if not normalized.get('social_security_enabled'):
+        for name in SOCIAL_SECURITY_INPUTS:
+            normalized.pop(name, None)
+    
+    if not (normalized.get('spouse_enabled') and normalized.get('spouse_social_security_enabled')):
+        normalized['spouse_enabled'] = False
+        normalized['spouse_social_security_enabled'] = False
+        for name in SPOUSE_SOCIAL_SECURITY_INPUTS:
+            normalized.pop(name, None)
+    
+    return normalized
+
+
+def calculation_cache_key(calculator_kwargs: Dict[str, Any], kind: str = 'calculation') -> str:
+    """Content hash of the kind of result, the normalized inputs, engine version and seed"""
+    inputs = normalize_calculator_inputs(calculator_kwargs)
+    for name in IGNORED_INPUTS_BY_KIND.get(kind, ()):
+        inputs.pop(name, None)
+    payload = {
+        'engine_version': ENGINE_VERSION,
+        'kind': kind,
+        'inputs': inputs
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    In-process LRU cache of calculation results with a size limit and TTL,
+    optionally backed by a SQLite table so entries survive restarts.
+    SQLite reads and writes run on a dedicated thread, off the event loop.
+    Cached results are shared between requests and must not be mutated.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int, sqlite_path: str = ""):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'persistent_hits': 0,
+            'evictions': 0
+        }
+        
+        self._connection: Optional[sqlite3.Connection] = None
+        self._io: Optional[ThreadPoolExecutor] = None
+        if sqlite_path:
+            # One thread owns the connection, so its statements never interleave
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="result-cache")
+            self._connection = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS calculation_result_cache ("
+                "key TEXT PRIMARY KEY, created_at REAL NOT NULL, result TEXT NOT NULL)"
+            )
+            self._connection.commit()
+    
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result for key, or None if it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, result = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return result
+                del self._entries[key]
+            
+            if self._connection is None:
+                self.stats['misses'] += 1
+                return None
+        
+        entry = await self._run_persistent(self._get_persistent, key, now)
+        with self._lock:
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            created_at, result = entry
+            self._store_memory(key, created_at, result)
+            self.stats['hits'] += 1
+            self.stats['persistent_hits'] += 1
+            return result
+    
+    async def set(self, key: str, result: Dict[str, Any]):
+        """Store a result, evicting the least recently used entries beyond max_entries"""
+        now = time.time()
+        with self._lock:
+            self._store_memory(key, now, result)
+        if self._connection is not None:
+            await self._run_persistent(self._set_persistent, key, now, result)
+    
+    async def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+        if self._connection is not None:
+            await self._run_persistent(self._clear_persistent)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit and miss counters plus current size"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'persistent': self._connection is not None
+            }
+    
+    def _store_memory(self, key: str, created_at: float, result: Dict[str, Any]):
+        self._entries[key] = (created_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+    
+    async def _run_persistent(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, functools.partial(fn, *args))
+    
+    def _get_persistent(self, key: str, now: float) -> Optional[tuple]:
+        row = self._connection.execute(
+            "SELECT created_at, result FROM calculation_result_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        created_at, payload = row
+        if now - created_at > self.ttl_seconds:
+            self._connection.execute("DELETE FROM calculation_result_cache WHERE key = ?", (key,))
+            self._connection.commit()
+            return None
+        return created_at, json.loads(payload)
+    
+    def _set_persistent(self, key: str, created_at: float, result: Dict[str, Any]):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO calculation_result_cache (key, created_at, result) VALUES (?, ?, ?)",
+            (key, created_at, json.dumps(result))
+        )
+        self._connection.commit()
+    
+    def _clear_persistent(self):
+        self._connection.execute("DELETE FROM calculation_result_cache")
+        self._connection.commit()
+
+
+result_cache = ResultCache(
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS,
+    sqlite_path=settings.RESULT_CACHE_SQLITE_PATH
+)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -53,13 +53,90 @@ class FireCalculationCreate(BaseModel):
     # 401K contribution parameters
     contribution_401k_percentage: float = Field(6.0, ge=0, le=100, description="Employee 401K contribution percentage of income")
     employer_match_percentage: float = Field(50.0, ge=0, le=200, description="Employer match percentage (% of employee contribution)")
+    
+    # Monte Carlo parameters
+    seed: Optional[int] = Field(None, ge=0, le=2**31 - 1, description="Random seed for reproducible Monte Carlo results")
 
     def validate_retirement_age(self):
         if self.retirement_age <= self.current_age:
             raise ValueError('Retirement age must be greater than current age')
         return self
 
-class FireCalculationResponse(BaseModel):
+class FireCalculationBatchCreate(BaseModel):
+    scenarios: List[FireCalculationCreate] = Field(default_factory=list, description="Scenarios to evaluate")
+    base: Optional[FireCalculationCreate] = Field(None, description="Base scenario that overrides are applied to")
+    overrides: List[Dict[str, Any]] = Field(default_factory=list, description="Field overrides, one scenario each, applied to base")
+    seed: Optional[int] = Field(None, ge=0, le=2**31 - 1, description="Random seed shared by scenarios that do not set their own")
+    save: bool = Field(False, description="Save each scenario as a calculation")
+    include_projection: bool = Field(False, description="Include year-by-year projection data in each result")
+
+class FireCalculationBatchResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    inputs: FireCalculationCreate
+    
+    # Calculated results
+    fire_number: float
+    coast_fire_number: float
+    years_to_fire: Optional[float]
+    years_to_coast_fire: Optional[float]
+    coast_fire_age: Optional[float]
+    current_fire_status: bool
+    current_coast_fire_status: bool
+    monthly_shortfall: float
+    projection_data: Optional[Dict[str, Any]] = None
+    monte_carlo_stats: Optional[Dict[str, Any]] = None
+
+class FireCalculationPreviewResponse(BaseModel):
+    # Calculated results for an unsaved calculation
+    fire_number: float
+    coast_fire_number: float
+    years_to_fire: Optional[float]
+    years_to_coast_fire: Optional[float]
+    coast_fire_age: Optional[float]
+    current_fire_status: bool
+    current_coast_fire_status: bool
+    monthly_shortfall: float
+    projection_data: Dict[str, Any]
+    percentile_trajectories: Optional[Dict[str, List[float]]] = None
+    seed: int
+    monte_carlo_stats: Optional[Dict[str, Any]] = None
+
+class FireCalculationBatchResponse(BaseModel):
+    seed: int
+    results: List[FireCalculationBatchResult]
+
+class SensitivityGridRequest(BaseModel):
+    base: FireCalculationCreate = Field(..., description="Scenario whose other inputs stay fixed")
+    x_parameter: str = Field(..., description="Input swept along the first axis")
+    x_values: List[float] = Field(..., min_length=1, description="Values for the first axis (rates in %)")
+    y_parameter: Optional[str] = Field(None, description="Optional input swept along the second axis")
+    y_values: Optional[List[float]] = Field(None, description="Values for the second axis (rates in %)")
+
+class SensitivityGridResponse(BaseModel):
+    x_parameter: str
+    x_values: List[float]
+    y_parameter: Optional[str]
+    y_values: Optional[List[float]]
+    # Indexed [x][y], or [x] when only one input is swept
+    fire_number: List[Any]
+    success_rate: List[Any]
+    years_to_fire: List[Any]
+    simulations_run: int
+    seed: int
+
+class RetirementCurveResponse(BaseModel):
+    # One entry per retirement age, from current_age + 1 to 100
+    ages: List[int]
+    fire_number: List[float]
+    coast_fire_number: List[float]
+    success_rate: List[float]
+    life_expectancy: int
+    simulations_run: int
+    seed: int
+
+class FireCalculationSummary(BaseModel):
+    """A saved calculation without its projection data, for history listings"""
     id: int
     current_age: int
     retirement_age: int
@@ -100,9 +177,34 @@ class FireCalculationResponse(BaseModel):
     years_to_fire: Optional[float]
     years_to_coast_fire: Optional[float]
     coast_fire_age: Optional[float]
-    projection_data: Optional[Dict[str, Any]]
+    seed: Optional[int] = None
+    
+    created_at: datetime
     
+    class Config:
+        from_attributes = True
+
+class FireCalculationResponse(FireCalculationSummary):
+    projection_data: Optional[Dict[str, Any]]
+    percentile_trajectories: Optional[Dict[str, List[float]]] = None
+    monte_carlo_stats: Optional[Dict[str, Any]] = None
+
+class FireCalculationPage(BaseModel):
+    # Newest first; pass next_cursor back as ?cursor= for the following page
+    items: List[Union[FireCalculationResponse, FireCalculationSummary]]
+    next_cursor: Optional[str] = None
+
+class CalculationJobResponse(BaseModel):
+    """Status of a background calculation job; fetch /api/jobs/{id}/result once it has succeeded"""
+    id: int
+    kind: str
+    status: str  # queued, running, succeeded or failed
+    size: int
+    attempts: int
+    error: Optional[str] = None
     created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
\ No newline at end of file
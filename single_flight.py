@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent identical work.
+    The first caller for a key starts the computation; callers arriving while it
+    is still running wait on the same task and receive the same result (or error).
+    The work is cancelled only once every caller waiting on it has been cancelled.
+    """
+    
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.stats = {
+            'leaders': 0,
+            'coalesced': 0,
+            'abandoned': 0
+        }
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() for key, joining an in-flight call for the same key if there is one"""
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda finished: self._finish(key, finished))
+            self.stats['leaders'] += 1
+        else:
+            self.stats['coalesced'] += 1
+        
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            # Shielded so a cancelled caller does not cancel work others are waiting on
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(task) == 1 and not task.done():
+                task.cancel()
+                self.stats['abandoned'] += 1
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+    
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved in case every waiter went away
+        if not task.cancelled():
+            task.exception()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'in_flight': len(self._tasks)}
+
+
+calculation_flights = SingleFlight()
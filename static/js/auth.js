@@ -4,6 +4,7 @@ class AuthManager {
         this.token = localStorage.getItem('access_token');
         this.userId = localStorage.getItem('user_id');
         this.username = localStorage.getItem('username');
+        this.savedCalculations = [];
         this.updateNavigation();
     }
 
@@ -35,30 +36,25 @@ class AuthManager {
         }
         
         try {
-            const response = await fetch('/api/calculations', {
+            const response = await fetch('/api/calculations/latest', {
                 headers: this.getAuthHeaders()
             });
             
             if (response.ok) {
-                const calculations = await response.json();
-                if (calculations.length > 0) {
-                    // Sort by created_at descending to get most recent first
-                    calculations.sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-                    const mostRecent = calculations[0];
-                    
-                    console.log('Loading most recent calculation:', mostRecent);
-                    this.populateFormWithCalculation(mostRecent);
-                    
-                    // If calculator exists, trigger calculation display
-                    if (window.calculator) {
-                        // Use a small delay to ensure form is fully populated
-                        setTimeout(() => {
-                            window.calculator.calculateGuest();
-                        }, 100);
-                    }
-                    
-                    return true;
+                const mostRecent = await response.json();
+                
+                console.log('Loading most recent calculation:', mostRecent);
+                this.populateFormWithCalculation(mostRecent);
+                
+                // If calculator exists, trigger calculation display
+                if (window.calculator) {
+                    // Use a small delay to ensure form is fully populated
+                    setTimeout(() => {
+                        window.calculator.calculateGuest();
+                    }, 100);
                 }
+                
+                return true;
             } else if (response.status === 401) {
                 this.logout();
             }
@@ -109,20 +105,26 @@ class AuthManager {
         }
     }
 
-    async showSavedCalculations() {
+    async showSavedCalculations(cursor = null) {
         if (!this.isAuthenticated()) {
             window.location.href = '/login';
             return;
         }
 
         try {
-            const response = await fetch('/api/calculations', {
+            // Summaries only, one page at a time
+            const params = new URLSearchParams({ limit: '20' });
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
+            const response = await fetch(`/api/calculations?${params}`, {
                 headers: this.getAuthHeaders()
             });
 
             if (response.ok) {
-                const calculations = await response.json();
-                this.displaySavedCalculations(calculations);
+                const page = await response.json();
+                this.savedCalculations = cursor ? this.savedCalculations.concat(page.items) : page.items;
+                this.displaySavedCalculations(this.savedCalculations, page.next_cursor);
             } else if (response.status === 401) {
                 this.logout();
             } else {
@@ -133,8 +135,8 @@ class AuthManager {
         }
     }
 
-    displaySavedCalculations(calculations) {
-        const modal = new bootstrap.Modal(document.getElementById('savedCalculationsModal'));
+    displaySavedCalculations(calculations, nextCursor = null) {
+        const modal = bootstrap.Modal.getOrCreateInstance(document.getElementById('savedCalculationsModal'));
         const list = document.getElementById('saved-calculations-list');
         
         if (calculations.length === 0) {
@@ -171,6 +173,16 @@ class AuthManager {
                     </div>
                 </div>
             `).join('');
+            
+            if (nextCursor) {
+                list.innerHTML += `
+                    <div class="text-center">
+                        <button class="btn btn-sm btn-outline-secondary" onclick="authManager.showSavedCalculations('${nextCursor}')">
+                            Load more
+                        </button>
+                    </div>
+                `;
+            }
         }
         
         modal.show();
@@ -179,14 +191,12 @@ class AuthManager {
     async loadCalculation(calculationId) {
         console.log('loadCalculation called with ID:', calculationId);
         try {
-            const response = await fetch('/api/calculations', {
+            const response = await fetch(`/api/calculations/${calculationId}`, {
                 headers: this.getAuthHeaders()
             });
             console.log('Fetch response status:', response.status);
             if (response.ok) {
-                const calculations = await response.json();
-                console.log('All calculations:', calculations);
-                const calculation = calculations.find(calc => calc.id === calculationId);
+                const calculation = await response.json();
                 console.log('Found calculation:', calculation);
                 
                 if (calculation) {
@@ -202,11 +212,11 @@ class AuthManager {
                     if (window.calculator) {
                         window.calculator.calculateGuest();
                     }
-                } else {
-                    alert('Calculation not found');
                 }
             } else if (response.status === 401) {
                 this.logout();
+            } else if (response.status === 404) {
+                alert('Calculation not found');
             } else {
                 alert('Failed to load calculation');
             }
@@ -3,6 +3,8 @@ class FireCalculator {
     constructor() {
         this.chart = null;
         this.currentResults = null;
+        // Identifies this tab, so the server only cancels calculations this tab superseded
+        this.clientSession = window.crypto && crypto.randomUUID ? crypto.randomUUID() : Math.random().toString(36).slice(2);
         this.initializeEventListeners();
         this.updateVisibility();
         this.autoLoadRecentCalculation();
@@ -32,11 +34,16 @@ class FireCalculator {
     }
 
     showSuccessToast(message) {
+        this.showToast(message, 'success', 'fa-check-circle');
+    }
+
+    showToast(message, level, icon) {
         // Create a temporary toast notification
         const toast = document.createElement('div');
-        toast.className = 'alert alert-success position-fixed';
+        toast.className = `alert alert-${level} position-fixed`;
         toast.style.cssText = 'top: 20px; right: 20px; z-index: 9999; opacity: 0.9;';
-        toast.innerHTML = `<i class="fas fa-check-circle"></i> ${message}`;
+        toast.innerHTML = `<i class="fas ${icon}"></i> `;
+        toast.appendChild(document.createTextNode(message));
         
         document.body.appendChild(toast);
         
@@ -350,18 +357,23 @@ class FireCalculator {
         };
     }
 
+    clientSessionHeaders(headers) {
+        return { ...headers, 'X-Client-Session': this.clientSession };
+    }
+
     async calculateWithSave() {
         const data = this.getFormData();
         
         try {
-            const response = await fetch('/api/calculate', {
+            const response = await fetch('/api/calculate?projection_format=compact', {
                 method: 'POST',
-                headers: authManager.getAuthHeaders(),
+                headers: this.clientSessionHeaders(authManager.getAuthHeaders()),
                 body: JSON.stringify(data)
             });
 
             if (response.ok) {
                 const results = await response.json();
+                results.projection_data = await this.decodeProjection(results.projection_data);
                 this.displayResults(results);
                 this.currentResults = results;
                 
@@ -381,11 +393,56 @@ class FireCalculator {
         }
     }
 
-    calculateGuest() {
+    async calculateGuest() {
         const data = this.getFormData();
         
-        // Perform client-side calculation for guest users
-        const results = this.performCalculation(data);
+        // Abandon the previous preview so the server stops simulating it
+        if (this.previewController) {
+            this.previewController.abort();
+        }
+        const controller = new AbortController();
+        this.previewController = controller;
+        
+        // Preview with the server's Monte Carlo engine, the same one saved calculations use
+        let results = null;
+        let retryAfter = null;
+        try {
+            const response = await fetch('/api/calculate/preview?projection_format=compact', {
+                method: 'POST',
+                headers: this.clientSessionHeaders({ 'Content-Type': 'application/json' }),
+                body: JSON.stringify(data),
+                signal: controller.signal
+            });
+            if (response.ok) {
+                results = await response.json();
+                results.projection_data = await this.decodeProjection(results.projection_data);
+            } else if (response.status === 429) {
+                retryAfter = parseInt(response.headers.get('Retry-After') || '1', 10);
+            }
+        } catch (error) {
+            if (error.name !== 'AbortError') {
+                console.warn('Preview unavailable:', error);
+            }
+        }
+        
+        // A newer preview started while this one was in flight
+        if (controller !== this.previewController) {
+            return;
+        }
+        if (!results) {
+            // Keep showing the last results rather than numbers from a different method
+            if (retryAfter !== null) {
+                this.showError(`Too many updates, retrying in ${retryAfter}s`);
+                setTimeout(() => {
+                    if (controller === this.previewController) {
+                        this.calculateGuest();
+                    }
+                }, retryAfter * 1000);
+            } else {
+                this.showError('Preview unavailable. Please try again.');
+            }
+            return;
+        }
         this.displayResults(results);
         this.currentResults = results;
         
@@ -396,109 +453,44 @@ class FireCalculator {
         }
     }
 
-    performCalculation(data) {
-        // Client-side implementation of FIRE calculations
-        const fireNumber = data.retirement_expenses / (data.safe_withdrawal_rate / 100);
-        const realReturnRate = (data.investment_return_rate - data.inflation_rate) / 100;
-        const yearsToRetirement = data.retirement_age - data.current_age;
-        const coastFireNumber = fireNumber / Math.pow(1 + realReturnRate, yearsToRetirement);
-        
-        // Calculate 401K contributions
-        const monthly401k = data.monthly_income * (data.contribution_401k_percentage / 100);
-        const monthlyEmployerMatch = monthly401k * (data.employer_match_percentage / 100);
-        const annual401k = monthly401k * 12;
-        const annualEmployerMatch = monthlyEmployerMatch * 12;
-        
-        // Calculate years to FIRE
-        let yearsToFire = null;
-        const annualSavings = data.monthly_savings * 12;
-        const totalAnnualSavings = annualSavings + annual401k + annualEmployerMatch;
-        const returnRate = data.investment_return_rate / 100;
-        
-        if (totalAnnualSavings > 0 && returnRate > 0) {
-            const numerator = Math.log((fireNumber * returnRate + totalAnnualSavings) / (data.current_assets * returnRate + totalAnnualSavings));
-            const denominator = Math.log(1 + returnRate);
-            yearsToFire = Math.max(0, numerator / denominator);
-        }
-        
-        // Calculate years to Coast FIRE
-        let yearsToCoastFire = null;
-        if (data.current_assets >= coastFireNumber) {
-            yearsToCoastFire = 0;
-        } else if (totalAnnualSavings > 0 && returnRate > 0) {
-            const numerator = Math.log((coastFireNumber * returnRate + totalAnnualSavings) / (data.current_assets * returnRate + totalAnnualSavings));
-            const denominator = Math.log(1 + returnRate);
-            yearsToCoastFire = Math.max(0, numerator / denominator);
+    async decodeProjection(projection) {
+        // Plain JSON projections pass through; see projection_codec.py for the compact layout
+        if (!projection || projection.format !== 'columnar-f32-v1') {
+            return projection;
         }
         
-        // Generate projection data
-        const projectionData = this.generateProjectionData(data, fireNumber, coastFireNumber);
-        
-        return {
-            fire_number: fireNumber,
-            coast_fire_number: coastFireNumber,
-            years_to_fire: yearsToFire,
-            years_to_coast_fire: yearsToCoastFire,
-            coast_fire_age: yearsToCoastFire ? data.current_age + yearsToCoastFire : null,
-            projection_data: projectionData,
-            current_coast_fire_status: data.current_assets >= coastFireNumber,
-            current_fire_status: data.current_assets >= fireNumber,
-            monte_carlo_stats: null  // No Monte Carlo stats in client-side calculation
+        const toBytes = (data) => Uint8Array.from(atob(data), (char) => char.charCodeAt(0));
+        const inflate = async (bytes) => {
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'));
+            return new Uint8Array(await new Response(stream).arrayBuffer());
         };
-    }
-
-    generateProjectionData(data, fireNumber, coastFireNumber) {
-        const years = [];
-        const ages = [];
-        const assets = [];
-        const coastFireMilestones = [];
-        const achievedCoastFire = [];
-        const achievedFire = [];
         
-        let currentAssets = data.current_assets;
-        const annualSavings = data.monthly_savings * 12;
-        const monthly401k = data.monthly_income * (data.contribution_401k_percentage / 100);
-        const monthlyEmployerMatch = monthly401k * (data.employer_match_percentage / 100);
-        const annual401k = monthly401k * 12;
-        const annualEmployerMatch = monthlyEmployerMatch * 12;
-        const totalAnnualSavings = annualSavings + annual401k + annualEmployerMatch;
-        const returnRate = data.investment_return_rate / 100;
-        const realReturnRate = (data.investment_return_rate - data.inflation_rate) / 100;
-        
-        for (let year = 0; year <= 40; year++) {
-            const age = data.current_age + year;
-            
-            years.push(year);
-            ages.push(age);
-            assets.push(currentAssets);
-            
-            // Calculate Coast FIRE milestone for this age
-            const yearsLeft = Math.max(0, data.retirement_age - age);
-            const milestone = yearsLeft > 0 ? fireNumber / Math.pow(1 + realReturnRate, yearsLeft) : fireNumber;
-            coastFireMilestones.push(milestone);
-            
-            achievedCoastFire.push(currentAssets >= milestone);
-            achievedFire.push(currentAssets >= fireNumber);
-            
-            // Update assets for next year
-            if (age < data.retirement_age) {
-                currentAssets = currentAssets * (1 + returnRate) + totalAnnualSavings;
-            } else {
-                const inflationAdjustedExpenses = data.retirement_expenses * Math.pow(1 + data.inflation_rate / 100, age - data.retirement_age);
-                currentAssets = currentAssets * (1 + returnRate) - inflationAdjustedExpenses;
+        const rows = projection.rows;
+        const decoded = {};
+        for (const [name, column] of Object.entries(projection.columns)) {
+            if (column.type === 'empty') {
+                decoded[name] = [];
+            } else if (column.type === 'same') {
+                decoded[name] = decoded[column.as].slice();
+            } else if (column.type === 'range') {
+                decoded[name] = Array.from({ length: rows }, (_, i) => column.start + i);
+            } else if (column.type === 'bits') {
+                const bytes = toBytes(column.data);
+                decoded[name] = Array.from({ length: rows }, (_, i) => ((bytes[i >> 3] >> (7 - (i & 7))) & 1) === 1);
+            } else if (column.type === 'float32') {
+                // Bytes are grouped by significance across values; interleave them back
+                const shuffled = await inflate(toBytes(column.data));
+                const view = new DataView(shuffled.buffer);
+                decoded[name] = Array.from({ length: rows }, (_, i) => {
+                    const value = new DataView(new ArrayBuffer(4));
+                    for (let b = 0; b < 4; b++) {
+                        value.setUint8(b, view.getUint8(b * rows + i));
+                    }
+                    return value.getFloat32(0, true);
+                });
             }
-            
-            if (currentAssets < 0) break;
         }
-        
-        return {
-            years,
-            ages,
-            assets,
-            coast_fire_milestones: coastFireMilestones,
-            achieved_coast_fire: achievedCoastFire,
-            achieved_fire: achievedFire
-        };
+        return decoded;
     }
 
     displayResults(results) {
@@ -773,7 +765,7 @@ class FireCalculator {
                 datasets: [
                     {
                         label: 'Your Assets',
-                        data: results.projection_data.assets,
+                        data: results.projection_data.assets || results.projection_data.total_assets,
                         borderColor: 'rgb(54, 162, 235)',
                         backgroundColor: 'rgba(54, 162, 235, 0.1)',
                         borderWidth: 3,
@@ -941,7 +933,7 @@ class FireCalculator {
         try {
             const response = await fetch('/api/calculate', {
                 method: 'POST',
-                headers: authManager.getAuthHeaders(),
+                headers: this.clientSessionHeaders(authManager.getAuthHeaders()),
                 body: JSON.stringify(data)
             });
             
@@ -969,8 +961,8 @@ class FireCalculator {
     }
 
     showError(message) {
-        // Show error toast or alert
         console.error(message);
+        this.showToast(message, 'danger', 'fa-exclamation-circle');
     }
 
     showSuccess(message) {
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from config import settings
+from models import User
+
+
+class AuthenticatedUserCache:
+    """
+    Short-lived cache of the user each bearer token resolves to, so authenticated
+    requests can skip JWT verification and the user lookup. Tokens are keyed to a
+    user id and users by id; invalidate_user drops a user and all their tokens.
+    Entries last at most ttl_seconds and never outlive the token's own expiry.
+    Each process has its own cache, so changes made elsewhere show up within the TTL.
+    Cached users are shared between requests and must not be mutated.
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._tokens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._users: Dict[int, User] = {}
+        self._user_tokens: Dict[int, set] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'invalidations': 0
+        }
+    
+    def get(self, token: str) -> Optional[User]:
+        """Return the user token resolves to, or None if it is not cached or has expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(token)
+            if entry is not None:
+                user_id, expires_at = entry
+                if now < expires_at:
+                    self._tokens.move_to_end(token)
+                    self.stats['hits'] += 1
+                    return self._users[user_id]
+                self._drop_token(token)
+            
+            self.stats['misses'] += 1
+            return None
+    
+    def set(self, token: str, user: User, token_expires_at: Optional[float] = None):
+        """Cache the user a verified token resolved to, evicting the least recently used tokens beyond max_entries"""
+        if self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        
+        with self._lock:
+            if token in self._tokens:
+                self._drop_token(token)
+            self._tokens[token] = (user.id, expires_at)
+            self._users[user.id] = user
+            self._user_tokens.setdefault(user.id, set()).add(token)
+            while len(self._tokens) > self.max_entries:
+                self._drop_token(next(iter(self._tokens)))
+    
+    def invalidate_user(self, user_id: int):
+        """Forget a user whose account changed, along with every token cached for them"""
+        with self._lock:
+            for token in self._user_tokens.pop(user_id, ()):
+                self._tokens.pop(token, None)
+            if self._users.pop(user_id, None) is not None:
+                self.stats['invalidations'] += 1
+    
+    def _drop_token(self, token: str):
+        user_id, _ = self._tokens.pop(token)
+        tokens = self._user_tokens.get(user_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._user_tokens[user_id]
+                self._users.pop(user_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+            self._users.clear()
+            self._user_tokens.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            tokens = len(self._tokens)
+            users = len(self._users)
+        return {
+            **self.stats,
+            'tokens': tokens,
+            'users': users,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+
+authenticated_user_cache = AuthenticatedUserCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES
+)